@@ -0,0 +1,19 @@
+import functools
+import json
+import os
+
+
+@functools.lru_cache(maxsize=1)
+def load_config() -> dict:
+    """
+    Load and parse config.json once per CDK process.
+
+    Stacks are instantiated repeatedly during synth, so the parsed config is
+    memoized to avoid re-reading the same file for every stack.
+    """
+    config_path = os.path.join(os.path.dirname(__file__), 'config.json')
+    try:
+        with open(config_path, 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError) as e:
+        raise ValueError(f"Missing or invalid config.json. Copy config.json.example to config.json and configure your domain. Error: {e}")
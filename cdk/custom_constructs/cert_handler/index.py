@@ -0,0 +1,49 @@
+import time
+
+import boto3
+
+# Cache clients per region so warm invokes skip TLS+session setup
+_acm_clients = {}
+
+
+def get_acm_client(region):
+    if region not in _acm_clients:
+        _acm_clients[region] = boto3.client('acm', region_name=region)
+    return _acm_clients[region]
+
+
+def handler(event, context):
+    request_type = event['RequestType']
+
+    if request_type == 'Create':
+        acm_client = get_acm_client(event['ResourceProperties'].get('Region', 'us-east-1'))
+        response = acm_client.request_certificate(
+            DomainName=event['ResourceProperties']['DomainName'],
+            ValidationMethod='DNS'
+        )
+        certificate_arn = response['CertificateArn']
+
+        # Poll DescribeCertificate with backoff so the certificate is visible
+        # (and ideally ISSUED) before CloudFormation moves on; DNS validation
+        # may still be pending, so give up gracefully after a few attempts
+        delay = 2
+        for _ in range(6):
+            try:
+                details = acm_client.describe_certificate(CertificateArn=certificate_arn)
+                if details['Certificate']['Status'] == 'ISSUED':
+                    break
+            except acm_client.exceptions.ResourceNotFoundException:
+                pass
+            time.sleep(delay)
+            delay = min(delay * 2, 30)
+
+        return {
+            'Data': {
+                'CertificateArn': certificate_arn
+            }
+        }
+    elif request_type == 'Delete':
+        # Certificate deletion will be handled automatically by CloudFormation
+        return {}
+    else:
+        return {}
@@ -1,10 +1,19 @@
+import os
+
 from aws_cdk import (
     Duration,
+    Fn,
+    Stack,
     aws_lambda as lambda_,
-    aws_apigateway as apigateway,
+    aws_apigatewayv2 as apigatewayv2,
+    aws_apigatewayv2_authorizers as apigatewayv2_authorizers,
+    aws_apigatewayv2_integrations as apigatewayv2_integrations,
+    aws_ecr_assets as ecr_assets,
     aws_secretsmanager as secretsmanager,
+    aws_ssm as ssm,
     aws_certificatemanager as acm,
     aws_iam as iam,
+    aws_logs as logs,
     RemovalPolicy,
     CustomResource,
     custom_resources as cr,
@@ -46,114 +55,137 @@ class McpServerConstruct(Construct):
             removal_policy=RemovalPolicy.DESTROY
         )
 
-        # Create the main MCP Lambda function
-        self.mcp_function = lambda_.Function(
-            self, "McpFunction",
-            runtime=lambda_.Runtime.PYTHON_3_12,
-            handler="lambda_handler.lambda_handler",
-            code=lambda_.Code.from_asset(source_code_path),
-            timeout=Duration.seconds(60),
-            memory_size=512,
-            environment={
-                "AUTH_SECRET_ARN": self.auth_secret.secret_arn
-            }
+        # Publish the secret ARN in Parameter Store so other stacks can share
+        # this secret instead of provisioning their own copy
+        self.auth_secret_param = ssm.StringParameter(
+            self, "AuthSecretArnParam",
+            parameter_name="/igg/auth/arn",
+            string_value=self.auth_secret.secret_arn
         )
 
-        # Create the Lambda authorizer function
-        self.authorizer_function = lambda_.Function(
-            self, "McpAuthorizerFunction",
-            runtime=lambda_.Runtime.PYTHON_3_12,
-            handler="authorizer.lambda_handler",
-            code=lambda_.Code.from_asset(source_code_path),
-            timeout=Duration.seconds(10),
+        # Create a single Lambda function for both the MCP handler and the
+        # authorizer; handler.py dispatches on event type. One function means
+        # one cold-start path and one warm pool for both roles. The image is
+        # lazy-loaded from ECR (SOCI), so cold starts only page in the bytes
+        # the runtime actually touches at init.
+        self.mcp_function = lambda_.DockerImageFunction(
+            self, "McpFunction",
+            architecture=lambda_.Architecture.ARM_64,
+            # Pin the image build to arm64; otherwise the asset builds for
+            # the Docker host's architecture and an x86 synth machine ships
+            # an image the arm64 function can't exec
+            code=lambda_.DockerImageCode.from_image_asset(
+                source_code_path,
+                platform=ecr_assets.Platform.LINUX_ARM64
+            ),
+            timeout=Duration.seconds(60),
+            log_retention=logs.RetentionDays.ONE_WEEK,
+            memory_size=1024,  # More CPU for cold-start import/init (also serves the authorizer)
             environment={
-                "AUTH_SECRET_ARN": self.auth_secret.secret_arn
+                "AUTH_SECRET_ARN": self.auth_secret.secret_arn,
+                # How long the handler may cache the secret value in memory
+                "SECRETS_MANAGER_TTL": "300"
             }
         )
 
-        # Grant both Lambda functions permission to read the secret
+        # Grant the Lambda function permission to read the secret
         self.auth_secret.grant_read(self.mcp_function)
-        self.auth_secret.grant_read(self.authorizer_function)
 
-        # Create cross-region certificate (Edge requires us-east-1)
+        # Publish one alias with provisioned concurrency so neither role pays
+        # a cold start on the request path (the authorizer runs on every
+        # authenticated request). Provisioned concurrency is allocated per
+        # qualifier, so the integration and the authorizer both invoke this
+        # alias rather than splitting the version across two configs — Lambda
+        # rejects a second provisioned-concurrency config on the same version
+        # anyway.
+        self.mcp_alias = lambda_.Alias(
+            self, "McpFunctionAlias",
+            alias_name="mcp",
+            version=self.mcp_function.current_version,
+            provisioned_concurrent_executions=2
+        )
+        Tags.of(self.mcp_alias).add("ProvisionedConcurrency", "true")
+
+        # Create the certificate in the stack's own region (regional HTTP
+        # API domains don't need us-east-1 like Edge endpoints did)
         self.certificate_arn = self._create_certificate(certificate_domain)
 
-        # Create custom domain for API Gateway
-        self.custom_domain = apigateway.DomainName(
+        # Create custom domain for API Gateway (HTTP APIs are regional, so
+        # the certificate lives in the stack's own region)
+        self.custom_domain = apigatewayv2.DomainName(
             self, "McpDomain",
             domain_name=domain_name,
             certificate=acm.Certificate.from_certificate_arn(
-                self, "ImportedCertificate", 
+                self, "ImportedCertificate",
                 self.certificate_arn
-            ),
-            endpoint_type=apigateway.EndpointType.EDGE,
-            security_policy=apigateway.SecurityPolicy.TLS_1_2
+            )
         )
 
-        # Create Lambda authorizer
-        self.auth = apigateway.TokenAuthorizer(
-            self, "McpBasicAuthorizer",
-            handler=self.authorizer_function,
-            authorizer_name="BasicAuthAuthorizer",
-            results_cache_ttl=Duration.seconds(300)
+        # Create Lambda authorizer (IAM response type: the handler returns a
+        # policy document, same contract as the old TokenAuthorizer)
+        self.auth = apigatewayv2_authorizers.HttpLambdaAuthorizer(
+            "BasicAuthAuthorizer",
+            self.mcp_alias,
+            response_types=[apigatewayv2_authorizers.HttpLambdaResponseType.IAM],
+            identity_source=["$request.header.Authorization"],
+            # Cache per Authorization header for the API Gateway max; basic-auth
+            # tokens change rarely, but rotation requires invalidating this cache
+            results_cache_ttl=Duration.hours(1)
         )
 
-        # Create API Gateway
-        self.api = apigateway.RestApi(
+        # Create the HTTP API (lower per-request latency and cost than REST)
+        self.api = apigatewayv2.HttpApi(
             self, "McpApi",
-            rest_api_name="MCP Server API",
+            api_name="MCP Server API",
             description="API Gateway for MCP Server",
-            default_cors_preflight_options=apigateway.CorsOptions(
-                allow_origins=apigateway.Cors.ALL_ORIGINS,
-                allow_methods=apigateway.Cors.ALL_METHODS,
+            cors_preflight=apigatewayv2.CorsPreflightOptions(
+                allow_origins=["*"],
+                allow_methods=[apigatewayv2.CorsHttpMethod.GET,
+                               apigatewayv2.CorsHttpMethod.POST,
+                               apigatewayv2.CorsHttpMethod.OPTIONS],
                 allow_headers=["Content-Type", "Authorization"]
             )
         )
 
-        # Create the API Gateway integration
-        lambda_integration = apigateway.LambdaIntegration(self.mcp_function)
-
-        # Add methods with authorization required
-        self.api.root.add_method("POST", lambda_integration, authorizer=self.auth)
-        self.api.root.add_method("GET", lambda_integration, authorizer=self.auth)
+        # Add routes with authorization required
+        lambda_integration = apigatewayv2_integrations.HttpLambdaIntegration(
+            "McpIntegration", self.mcp_alias
+        )
+        self.api.add_routes(
+            path="/",
+            methods=[apigatewayv2.HttpMethod.GET, apigatewayv2.HttpMethod.POST],
+            integration=lambda_integration,
+            authorizer=self.auth
+        )
 
         # Connect the custom domain to the API
-        self.custom_domain.add_base_path_mapping(self.api, base_path="")
+        apigatewayv2.ApiMapping(
+            self, "McpApiMapping",
+            api=self.api,
+            domain_name=self.custom_domain
+        )
 
         # Apply tags
         Tags.of(self).add("Component", "McpServer")
 
     def _create_certificate(self, certificate_domain: str) -> str:
-        """Create SSL certificate in us-east-1 for API Gateway Edge."""
+        """Create SSL certificate in the stack region for the API domain."""
+        # Non-deploy commands (cdk ls/diff in CI) can skip synthesizing the
+        # custom-resource provider sub-stack with -c skip_cert_cr=true and
+        # reuse the already-issued certificate instead
+        if self.node.try_get_context("skip_cert_cr"):
+            return Fn.import_value("ExistingCertArn")
+
         certificate_handler = lambda_.Function(
             self, "CertificateHandler",
             runtime=lambda_.Runtime.PYTHON_3_12,
+            architecture=lambda_.Architecture.ARM_64,
             handler="index.handler",
-            code=lambda_.Code.from_inline("""
-import boto3
-import json
-
-def handler(event, context):
-    request_type = event['RequestType']
-    
-    if request_type == 'Create':
-        acm_client = boto3.client('acm', region_name='us-east-1')
-        response = acm_client.request_certificate(
-            DomainName=event['ResourceProperties']['DomainName'],
-            ValidationMethod='DNS'
-        )
-        return {
-            'Data': {
-                'CertificateArn': response['CertificateArn']
-            }
-        }
-    elif request_type == 'Delete':
-        # Certificate deletion will be handled automatically by CloudFormation
-        return {}
-    else:
-        return {}
-"""),
-            timeout=Duration.minutes(5)
+            code=lambda_.Code.from_asset(
+                os.path.join(os.path.dirname(__file__), 'cert_handler')
+            ),
+            timeout=Duration.minutes(5),
+            log_retention=logs.RetentionDays.ONE_WEEK
         )
         
         # Add IAM permissions for ACM operations
@@ -177,7 +209,11 @@ def handler(event, context):
         certificate_resource = CustomResource(
             self, "CrossRegionCertificate",
             service_token=certificate_provider.service_token,
-            properties={'DomainName': certificate_domain}
+            properties={
+                'DomainName': certificate_domain,
+                # Regional HTTP API domains need the certificate in-region
+                'Region': Stack.of(self).region
+            }
         )
         
         return certificate_resource.get_att_string('CertificateArn')
@@ -190,7 +226,7 @@ def handler(event, context):
     @property
     def domain_target(self) -> str:
         """Returns the domain target for CNAME configuration."""
-        return self.custom_domain.domain_name_alias_domain_name
+        return self.custom_domain.regional_domain_name
 
     @property
     def auth_secret_arn(self) -> str:
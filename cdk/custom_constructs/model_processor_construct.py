@@ -1,12 +1,18 @@
 from aws_cdk import (
+    AssetHashType,
+    BundlingOptions,
     Duration,
     aws_lambda as lambda_,
+    aws_lambda_event_sources as lambda_event_sources,
     aws_s3 as s3,
     aws_s3_notifications as s3n,
+    aws_sqs as sqs,
     aws_iam as iam,
+    aws_logs as logs,
     Tags
 )
 from constructs import Construct
+import hashlib
 import os
 
 
@@ -27,13 +33,23 @@ class ModelProcessorConstruct(Construct):
     ) -> None:
         super().__init__(scope, construct_id, **kwargs)
 
-        # Create Lambda layer for heavy dependencies (pandas, nltk)
+        # Create Lambda layer for heavy dependencies (pandas, nltk).
+        # Hash the layer asset from requirements.txt instead of walking the
+        # whole installed tree, so synth skips re-hashing tens of MBs; the
+        # layer contents only change when requirements.txt does.
         layer_path = os.path.join(os.path.dirname(__file__), '..', '..', 'lambda-layer')
+        with open(os.path.join(layer_path, 'requirements.txt'), 'rb') as f:
+            layer_hash = hashlib.sha256(f.read()).hexdigest()
         dependencies_layer = lambda_.LayerVersion(
             self,
-            "ModelProcessorDependencies", 
-            code=lambda_.Code.from_asset(layer_path),
+            "ModelProcessorDependencies",
+            code=lambda_.Code.from_asset(
+                layer_path,
+                asset_hash=layer_hash,
+                asset_hash_type=AssetHashType.CUSTOM
+            ),
             compatible_runtimes=[lambda_.Runtime.PYTHON_3_12],
+            compatible_architectures=[lambda_.Architecture.ARM_64],
             description="Heavy dependencies for model processing (pandas, nltk)"
         )
 
@@ -42,27 +58,70 @@ class ModelProcessorConstruct(Construct):
             self,
             "ModelProcessorFunction",
             runtime=lambda_.Runtime.PYTHON_3_12,
+            architecture=lambda_.Architecture.ARM_64,
             handler="model_processor.lambda_handler",
-            code=lambda_.Code.from_asset(source_code_path),
+            # Ship pre-compiled bytecode so cold starts skip .py -> .pyc
+            # compilation entirely
+            code=lambda_.Code.from_asset(
+                source_code_path,
+                bundling=BundlingOptions(
+                    image=lambda_.Runtime.PYTHON_3_12.bundling_image,
+                    command=[
+                        "bash", "-c",
+                        "cp -r . /asset-output && python -m compileall -q -b /asset-output && find /asset-output -name '*.py' -delete"
+                    ]
+                )
+            ),
             layers=[dependencies_layer],
-            timeout=Duration.minutes(15),  # CSV processing can take time
-            memory_size=1024,  # More memory for CSV processing
+            timeout=Duration.minutes(5),  # CSV processing can take time
+            memory_size=1024,  # More memory (and CPU) for CSV processing
+            log_retention=logs.RetentionDays.ONE_WEEK,
             environment={
                 "BUCKET_NAME": bucket.bucket_name,
-                "INDEX_FILE": "index.json"
+                "INDEX_FILE": "index.json",
+                # Bytecode ships pre-compiled; don't write __pycache__ at runtime
+                "PYTHONDONTWRITEBYTECODE": "1"
             }
         )
 
         # Grant Lambda permissions to read/write S3 bucket
         bucket.grant_read_write(self.processor_function)
 
+        # Buffer S3 notifications through SQS so bursty uploads are batched
+        # into fewer invocations instead of fanning out into parallel cold
+        # starts (visibility timeout must exceed the function timeout).
+        # A failed batch is redelivered whole, so a malformed CSV would
+        # otherwise cycle for the full retention period, reprocessing its
+        # batch-mates every round; after three receives (two retries, like
+        # the baseline S3 async invoke) the message parks in the DLQ instead
+        self.csv_dlq = sqs.Queue(
+            self, "CsvDeadLetterQueue",
+            retention_period=Duration.days(14)
+        )
+        self.csv_queue = sqs.Queue(
+            self, "CsvQueue",
+            visibility_timeout=Duration.minutes(6),
+            dead_letter_queue=sqs.DeadLetterQueue(
+                max_receive_count=3,
+                queue=self.csv_dlq
+            )
+        )
+
         # Add S3 trigger for CSV files
         bucket.add_event_notification(
             s3.EventType.OBJECT_CREATED,
-            s3n.LambdaDestination(self.processor_function),
+            s3n.SqsDestination(self.csv_queue),
             s3.NotificationKeyFilter(suffix=".csv")
         )
 
+        self.processor_function.add_event_source(
+            lambda_event_sources.SqsEventSource(
+                self.csv_queue,
+                batch_size=10,
+                max_batching_window=Duration.seconds(5)
+            )
+        )
+
         # Apply tags
         Tags.of(self).add("Component", "ModelProcessor")
 
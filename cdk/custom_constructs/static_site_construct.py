@@ -1,8 +1,9 @@
 from aws_cdk import (
+    Duration,
     aws_s3 as s3,
-    aws_apigateway as apigateway,
     aws_certificatemanager as acm,
-    aws_iam as iam,
+    aws_cloudfront as cloudfront,
+    aws_cloudfront_origins as origins,
     RemovalPolicy,
     Tags
 )
@@ -11,8 +12,8 @@ from constructs import Construct
 
 class StaticSiteConstruct(Construct):
     """
-    A construct that creates an S3 bucket served through API Gateway as a static website.
-    Supports arbitrary path structures and serves files directly from S3.
+    A construct that creates an S3 bucket served through CloudFront as a static website.
+    Requests are cached at the edge, so S3 is only hit on cache misses.
     """
 
     def __init__(
@@ -34,142 +35,49 @@ class StaticSiteConstruct(Construct):
             bucket_name=bucket_name,
             versioned=True,
             removal_policy=RemovalPolicy.RETAIN,
-            public_read_access=False,  # Access via API Gateway only
+            public_read_access=False,  # Access via CloudFront only
         )
 
-        # Create IAM role for API Gateway to access S3
-        self.api_gateway_role = iam.Role(
-            self,
-            "ApiGatewayS3Role",
-            assumed_by=iam.ServicePrincipal("apigateway.amazonaws.com"),
-            inline_policies={
-                "S3Access": iam.PolicyDocument(
-                    statements=[
-                        iam.PolicyStatement(
-                            effect=iam.Effect.ALLOW,
-                            actions=["s3:GetObject"],
-                            resources=[f"{self.bucket.bucket_arn}/*"]
-                        )
-                    ]
-                )
-            }
+        # Serve the bucket through CloudFront with Origin Access Control.
+        # Cache hits never touch S3, and default_root_object handles the
+        # / -> index.html mapping that previously needed a second API method.
+        site_origin = origins.S3BucketOrigin.with_origin_access_control(self.bucket)
+
+        # index.json and the model JSONs are rewritten in place by the
+        # processor, so cap their edge TTL at the MCP server's own 5-minute
+        # index cache instead of the 24h CACHING_OPTIMIZED default — a day-old
+        # edge copy would hide freshly processed models with no invalidation
+        # wired anywhere
+        json_cache_policy = cloudfront.CachePolicy(
+            self, "MutableJsonCachePolicy",
+            default_ttl=Duration.minutes(5),
+            min_ttl=Duration.seconds(0),
+            max_ttl=Duration.minutes(5),
+            enable_accept_encoding_gzip=True
         )
 
-        # Create custom domain for API Gateway
-        self.custom_domain = apigateway.DomainName(
+        self.distribution = cloudfront.Distribution(
             self,
-            "StaticSiteDomain",
-            domain_name=domain_name,
+            "StaticSiteDistribution",
+            default_behavior=cloudfront.BehaviorOptions(
+                origin=site_origin,
+                cache_policy=cloudfront.CachePolicy.CACHING_OPTIMIZED,
+                viewer_protocol_policy=cloudfront.ViewerProtocolPolicy.REDIRECT_TO_HTTPS
+            ),
+            additional_behaviors={
+                "*.json": cloudfront.BehaviorOptions(
+                    origin=site_origin,
+                    cache_policy=json_cache_policy,
+                    viewer_protocol_policy=cloudfront.ViewerProtocolPolicy.REDIRECT_TO_HTTPS
+                )
+            },
+            default_root_object="index.html",
+            domain_names=[domain_name],
             certificate=acm.Certificate.from_certificate_arn(
                 self, "ImportedCertificate", certificate_arn
-            ),
-            endpoint_type=apigateway.EndpointType.REGIONAL,
-            security_policy=apigateway.SecurityPolicy.TLS_1_2
-        )
-
-        # Create API Gateway for serving S3 content
-        self.api = apigateway.RestApi(
-            self,
-            "StaticSiteApi",
-            rest_api_name=f"Static Site API - {domain_name}",
-            description=f"API Gateway serving S3 static content for {domain_name}",
-            default_cors_preflight_options=apigateway.CorsOptions(
-                allow_origins=apigateway.Cors.ALL_ORIGINS,
-                allow_methods=["GET", "HEAD", "OPTIONS"],
-                allow_headers=["Content-Type", "Authorization"]
             )
         )
 
-        # Create proxy resource for handling all paths
-        proxy_resource = self.api.root.add_resource("{proxy+}")
-        
-        # S3 integration for proxy paths
-        s3_integration = apigateway.AwsIntegration(
-            service="s3",
-            integration_http_method="GET",
-            path=f"{self.bucket.bucket_name}/{{proxy}}",
-            options=apigateway.IntegrationOptions(
-                credentials_role=self.api_gateway_role,
-                integration_responses=[
-                    apigateway.IntegrationResponse(
-                        status_code="200",
-                        response_parameters={
-                            "method.response.header.Content-Type": "integration.response.header.Content-Type",
-                            "method.response.header.Content-Length": "integration.response.header.Content-Length",
-                        }
-                    ),
-                    apigateway.IntegrationResponse(
-                        status_code="404",
-                        selection_pattern="403"  # S3 returns 403 for missing objects
-                    )
-                ],
-                request_parameters={
-                    "integration.request.path.proxy": "method.request.path.proxy"
-                }
-            )
-        )
-
-        # Add GET method to proxy resource
-        proxy_resource.add_method(
-            "GET",
-            s3_integration,
-            method_responses=[
-                apigateway.MethodResponse(
-                    status_code="200",
-                    response_parameters={
-                        "method.response.header.Content-Type": True,
-                        "method.response.header.Content-Length": True,
-                    }
-                ),
-                apigateway.MethodResponse(status_code="404")
-            ],
-            request_parameters={
-                "method.request.path.proxy": True
-            }
-        )
-
-        # Handle root path (/) - serve index.html by default
-        root_integration = apigateway.AwsIntegration(
-            service="s3",
-            integration_http_method="GET",
-            path=f"{self.bucket.bucket_name}/index.html",
-            options=apigateway.IntegrationOptions(
-                credentials_role=self.api_gateway_role,
-                integration_responses=[
-                    apigateway.IntegrationResponse(
-                        status_code="200",
-                        response_parameters={
-                            "method.response.header.Content-Type": "integration.response.header.Content-Type",
-                            "method.response.header.Content-Length": "integration.response.header.Content-Length",
-                        }
-                    ),
-                    apigateway.IntegrationResponse(
-                        status_code="404",
-                        selection_pattern="403"
-                    )
-                ]
-            )
-        )
-
-        # Add GET method to root
-        self.api.root.add_method(
-            "GET",
-            root_integration,
-            method_responses=[
-                apigateway.MethodResponse(
-                    status_code="200",
-                    response_parameters={
-                        "method.response.header.Content-Type": True,
-                        "method.response.header.Content-Length": True,
-                    }
-                ),
-                apigateway.MethodResponse(status_code="404")
-            ]
-        )
-
-        # Connect custom domain to API
-        self.custom_domain.add_base_path_mapping(self.api, base_path="")
-
         # Apply tags
         Tags.of(self).add("Component", "StaticSite")
 
@@ -179,11 +87,11 @@ class StaticSiteConstruct(Construct):
         return self.bucket.bucket_name
 
     @property
-    def api_url(self) -> str:
-        """Returns the API Gateway URL."""
-        return self.api.url
+    def distribution_url(self) -> str:
+        """Returns the CloudFront distribution URL."""
+        return f"https://{self.distribution.distribution_domain_name}"
 
     @property
     def domain_target(self) -> str:
         """Returns the domain target for CNAME configuration."""
-        return self.custom_domain.domain_name_alias_domain_name
+        return self.distribution.distribution_domain_name
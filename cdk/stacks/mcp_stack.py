@@ -1,13 +1,12 @@
-import os
-import json
 from aws_cdk import (
     Stack,
-    CfnOutput,
-    Tags
+    CfnOutput
 )
 from constructs import Construct
 
+from config import load_config
 from custom_constructs.mcp_server_construct import McpServerConstruct
+from tagging import apply_common_tags
 
 
 class McpStack(Stack):
@@ -19,22 +18,16 @@ class McpStack(Stack):
     def __init__(self, scope: Construct, construct_id: str, **kwargs) -> None:
         super().__init__(scope, construct_id, **kwargs)
         
-        # Load configuration from config.json
-        config_path = os.path.join(os.path.dirname(__file__), '..', 'config.json')
-        try:
-            with open(config_path, 'r') as f:
-                config = json.load(f)
-            
-            # Get MCP configuration (fallback to root level for backward compatibility)
-            mcp_config = config.get('mcp', config)
-            domain_name = mcp_config.get('domain')
-            certificate_domain = mcp_config.get('certificateDomain', domain_name)
-            
-            if not domain_name:
-                raise ValueError("mcp.domain is required in config.json")
-                
-        except (FileNotFoundError, KeyError, json.JSONDecodeError) as e:
-            raise ValueError(f"Missing or invalid config.json for MCP server. Error: {e}")
+        # Load configuration from config.json (cached per CDK process)
+        config = load_config()
+
+        # Get MCP configuration (fallback to root level for backward compatibility)
+        mcp_config = config.get('mcp', config)
+        domain_name = mcp_config.get('domain')
+        certificate_domain = mcp_config.get('certificateDomain', domain_name)
+
+        if not domain_name:
+            raise ValueError("mcp.domain is required in config.json")
 
         # Create the MCP server construct
         self.mcp_server = McpServerConstruct(
@@ -44,10 +37,7 @@ class McpStack(Stack):
         )
 
         # Apply stack-level tags
-        Tags.of(self).add("Project", "igg")
-        Tags.of(self).add("CDK", "true")
-        Tags.of(self).add("Environment", "prod")
-        Tags.of(self).add("Stack", "MCP")
+        apply_common_tags(self, {"Stack": "MCP"})
 
         # Output important values
         CfnOutput(
@@ -1,14 +1,13 @@
-import os
-import json
 from aws_cdk import (
     Stack,
-    CfnOutput,
-    Tags
+    CfnOutput
 )
 from constructs import Construct
 
+from config import load_config
 from custom_constructs.static_site_construct import StaticSiteConstruct
 from custom_constructs.model_processor_construct import ModelProcessorConstruct
+from tagging import apply_common_tags
 
 
 class StaticSiteStack(Stack):
@@ -20,23 +19,17 @@ class StaticSiteStack(Stack):
     def __init__(self, scope: Construct, construct_id: str, **kwargs) -> None:
         super().__init__(scope, construct_id, **kwargs)
         
-        # Load configuration from config.json
-        config_path = os.path.join(os.path.dirname(__file__), '..', 'config.json')
-        try:
-            with open(config_path, 'r') as f:
-                config = json.load(f)
-            
-            # Get static site configuration
-            static_config = config.get('static_site', {})
-            domain_name = static_config.get('domain')
-            certificate_arn = static_config.get('certificate_arn')
-            bucket_name = static_config.get('bucket_name')
-            
-            if not certificate_arn or not domain_name or not bucket_name:
-                raise ValueError("static_site.certificate_arn, static_site.domain, and static_site.bucket_name are required in config.json")
-                
-        except (FileNotFoundError, KeyError, json.JSONDecodeError) as e:
-            raise ValueError(f"Missing or invalid config.json for static site. Error: {e}")
+        # Load configuration from config.json (cached per CDK process)
+        config = load_config()
+
+        # Get static site configuration
+        static_config = config.get('static_site', {})
+        domain_name = static_config.get('domain')
+        certificate_arn = static_config.get('certificate_arn')
+        bucket_name = static_config.get('bucket_name')
+
+        if not certificate_arn or not domain_name or not bucket_name:
+            raise ValueError("static_site.certificate_arn, static_site.domain, and static_site.bucket_name are required in config.json")
 
         # Create the static site construct
         self.static_site = StaticSiteConstruct(
@@ -53,10 +46,7 @@ class StaticSiteStack(Stack):
         )
 
         # Apply stack-level tags
-        Tags.of(self).add("Project", "igg")
-        Tags.of(self).add("CDK", "true")
-        Tags.of(self).add("Environment", "prod")
-        Tags.of(self).add("Stack", "StaticSite")
+        apply_common_tags(self, {"Stack": "StaticSite"})
 
         # Output important values
         CfnOutput(
@@ -72,9 +62,9 @@ class StaticSiteStack(Stack):
         )
 
         CfnOutput(
-            self, "ApiGatewayUrl",
-            value=self.static_site.api_url,
-            description="API Gateway default endpoint URL"
+            self, "DistributionUrl",
+            value=self.static_site.distribution_url,
+            description="CloudFront distribution URL"
         )
 
         CfnOutput(
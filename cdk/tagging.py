@@ -0,0 +1,15 @@
+from aws_cdk import Tags
+
+# Tags shared by every stack in the app
+COMMON_TAGS = {
+    "Project": "igg",
+    "CDK": "true",
+    "Environment": "prod",
+}
+
+
+def apply_common_tags(stack, extra: dict = None) -> None:
+    """Apply the shared project tags (plus any stack-specific extras) in one pass."""
+    tags = {**COMMON_TAGS, **(extra or {})}
+    for key, value in tags.items():
+        Tags.of(stack).add(key, value)
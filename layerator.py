@@ -8,9 +8,54 @@ import os
 import subprocess
 import sys
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 
+# Directories that ship inside wheels but are never imported at runtime
+_PRUNE_DIR_NAMES = {"tests", "test", "__pycache__"}
+
+
+def precompile_layer(python_dir: Path) -> None:
+    """Compile layer sources to .pyc at build time and drop the .py files.
+
+    First import on a cold start otherwise bytecode-compiles everything
+    (the runtime sets PYTHONDONTWRITEBYTECODE, so it recompiles every cold
+    start). -b writes foo.pyc next to foo.py so imports find it directly.
+    nltk keeps its sources: its resource loader reads .py files at runtime.
+    """
+    subprocess.run(
+        [sys.executable, "-m", "compileall", "-b", "-j", "0", "-q", str(python_dir)],
+        check=False, capture_output=True,
+    )
+    for py_file in python_dir.rglob("*.py"):
+        if "nltk" in py_file.relative_to(python_dir).parts:
+            continue
+        if py_file.with_suffix(".pyc").exists():
+            py_file.unlink()
+
+
+def prune_layer(python_dir: Path) -> None:
+    """Strip shared libraries and drop test/cache baggage from the layer.
+
+    Unstripped .so files and bundled test suites inflate the layer by tens
+    of MB, slowing cold-start unpack and eating into the 250MB limit.
+    """
+    for so_file in python_dir.rglob("*.so*"):
+        # strip may be missing or not understand cross-compiled aarch64
+        # binaries on the build host; best-effort only
+        subprocess.run(
+            ["strip", "--strip-unneeded", str(so_file)],
+            check=False, capture_output=True,
+        )
+
+    for path in sorted(python_dir.rglob("*"), reverse=True):
+        if path.is_dir() and path.name in _PRUNE_DIR_NAMES:
+            shutil.rmtree(path, ignore_errors=True)
+        elif path.is_file() and path.suffix == ".pyi":
+            path.unlink()
+
+
 def main():
     """Build Lambda layer with heavy dependencies."""
     print("Building Lambda layer for IGG...")
@@ -21,82 +66,110 @@ def main():
     python_dir = layer_dir / "python"
     requirements_file = project_root / "lambda-layer" / "requirements.txt"
     
-    # Clean up existing layer
-    if layer_dir.exists():
-        print(f"Cleaning up existing layer: {layer_dir}")
-        shutil.rmtree(layer_dir)
-    
+    # Clean up existing layer contents, keeping the checked-in
+    # requirements.txt: it is the canonical package list (shared with
+    # `make layer`) and the CDK asset hash is derived from it
+    if python_dir.exists():
+        print(f"Cleaning up existing layer: {python_dir}")
+        shutil.rmtree(python_dir)
+
     # Create layer directory structure
     python_dir.mkdir(parents=True, exist_ok=True)
-    
-    # Create requirements.txt for layer (heavy dependencies only)
-    layer_requirements = [
-        "pandas>=1.5.0",
-        "nltk>=3.8",
-        # boto3/botocore are provided by Lambda runtime
-        # mcp is only needed for the MCP server, not Lambda
-    ]
-    
-    with open(requirements_file, 'w') as f:
-        f.write('\n'.join(layer_requirements))
-    
-    print(f"Created layer requirements: {requirements_file}")
-    
-    # Install dependencies to layer
-    pip_command = [
-        sys.executable, "-m", "pip", "install",
-        "-r", str(requirements_file),
-        "-t", str(python_dir),
-        "--no-deps",  # Don't install sub-dependencies automatically
-        "--platform", "linux_x86_64",  # Lambda platform
-        "--implementation", "cp",
-        "--python-version", "3.12",
-        "--only-binary=:all:",  # Only use binary wheels
-    ]
-    
-    print(f"Installing dependencies to layer...")
-    print(f"Command: {' '.join(pip_command)}")
-    
-    try:
-        result = subprocess.run(pip_command, check=True, capture_output=True, text=True)
-        print("Dependencies installed successfully")
-        if result.stdout:
-            print(f"Output: {result.stdout}")
-    except subprocess.CalledProcessError as e:
-        print(f"Failed to install dependencies: {e}")
-        print(f"Error output: {e.stderr}")
-        return 1
-    
-    # Install sub-dependencies manually
-    subdeps = [
-        "numpy>=1.20.0",
-        "python-dateutil>=2.8.0", 
-        "pytz>=2020.1",
-        "six>=1.15.0",
-        "regex>=2021.0.0",
-        "click>=7.0.0",
-        "joblib>=1.0.0",
-        "tqdm>=4.50.0",
-    ]
-    
-    subdep_command = [
-        sys.executable, "-m", "pip", "install"
-    ] + subdeps + [
-        "-t", str(python_dir),
-        "--platform", "linux_x86_64",
-        "--implementation", "cp", 
-        "--python-version", "3.12",
-        "--only-binary=:all:",
-    ]
-    
-    print(f"Installing sub-dependencies...")
-    try:
-        subprocess.run(subdep_command, check=True, capture_output=True)
-        print("Sub-dependencies installed successfully")
-    except subprocess.CalledProcessError as e:
-        print(f"Warning: Some sub-dependencies failed: {e}")
-        # Continue anyway, Lambda might have some of these
-    
+
+    print(f"Installing layer requirements from: {requirements_file}")
+
+    # Install dependencies to layer. Prefer uv when available (much faster
+    # resolver/installer); fall back to pip. Either way a repo-local wheel
+    # cache makes repeated layer builds near-instant.
+    cache_dir = project_root / ".layer-cache"
+    if shutil.which("uv"):
+        pip_command = [
+            "uv", "pip", "install",
+            "-r", str(requirements_file),
+            "--target", str(python_dir),
+            "--no-deps",
+            "--python-platform", "aarch64-manylinux2014",  # Lambda platform (Graviton2)
+            "--python-version", "3.12",
+            "--only-binary", ":all:",
+            "--no-compile",  # runtime never writes .pyc; don't ship build-host ones
+            "--cache-dir", str(cache_dir),
+        ]
+
+        print(f"Installing dependencies to layer...")
+        print(f"Command: {' '.join(pip_command)}")
+
+        try:
+            result = subprocess.run(pip_command, check=True, capture_output=True, text=True)
+            print("Dependencies installed successfully")
+            if result.stdout:
+                print(f"Output: {result.stdout}")
+        except subprocess.CalledProcessError as e:
+            print(f"Failed to install dependencies: {e}")
+            print(f"Error output: {e.stderr}")
+            return 1
+    else:
+        # pip path: download all wheels in one resolver pass, then unpack
+        # them concurrently. Unpacking is mostly zip decompression, which
+        # parallelizes well; uv does the equivalent internally.
+        wheels_dir = cache_dir / "wheels"
+        wheels_dir.mkdir(parents=True, exist_ok=True)
+
+        download_command = [
+            sys.executable, "-m", "pip", "download",
+            "-r", str(requirements_file),
+            "-d", str(wheels_dir),
+            "--no-deps",
+            "--platform", "manylinux2014_aarch64",  # Lambda platform (Graviton2)
+            "--implementation", "cp",
+            "--python-version", "3.12",
+            "--only-binary=:all:",  # Only use binary wheels
+        ]
+
+        print(f"Downloading wheels...")
+        print(f"Command: {' '.join(download_command)}")
+
+        try:
+            subprocess.run(download_command, check=True, capture_output=True, text=True)
+        except subprocess.CalledProcessError as e:
+            print(f"Failed to download wheels: {e}")
+            print(f"Error output: {e.stderr}")
+            return 1
+
+        def install_wheel(wheel: Path) -> None:
+            # The same cross-platform flags as the download step: without
+            # them pip rejects the aarch64-tagged wheels on any build host
+            # that isn't aarch64 Linux itself
+            subprocess.run([
+                sys.executable, "-m", "pip", "install",
+                str(wheel),
+                "-t", str(python_dir),
+                "--no-deps",
+                "--no-index",
+                "--no-compile",
+                "--platform", "manylinux2014_aarch64",
+                "--implementation", "cp",
+                "--python-version", "3.12",
+                "--only-binary=:all:",
+            ], check=True, capture_output=True)
+
+        wheels = sorted(wheels_dir.glob("*.whl"))
+        print(f"Unpacking {len(wheels)} wheels in parallel...")
+        try:
+            with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+                # list() forces any install failure to surface here
+                list(executor.map(install_wheel, wheels))
+            print("Dependencies installed successfully")
+        except subprocess.CalledProcessError as e:
+            print(f"Failed to install dependencies: {e}")
+            return 1
+    
+    # Precompile bytecode, then strip binaries and remove test/cache
+    # directories before measuring
+    print("Precompiling layer to bytecode...")
+    precompile_layer(python_dir)
+    print("Pruning layer (strip .so, drop tests/__pycache__)...")
+    prune_layer(python_dir)
+
     # Check layer size
     layer_size = sum(f.stat().st_size for f in python_dir.rglob('*') if f.is_file())
     layer_size_mb = layer_size / (1024 * 1024)
@@ -1,21 +1,61 @@
+import hmac
 import json
 import base64
 import os
+import time
 import boto3
 from botocore.exceptions import ClientError
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Serializing the full event to CloudWatch on every call is pure overhead
+# at high QPS; opt in explicitly when debugging
+_DEBUG = os.environ.get('AUTHORIZER_DEBUG') == '1'
+
+# Create the client once per container so warm invokes skip session setup
+secrets_client = boto3.client('secretsmanager')
+
+# Cache the secret across warm invocations; the TTL bounds how long a
+# rotated password keeps being accepted from a warm container
+_SECRET_TTL_SECONDS = int(os.environ.get('SECRETS_MANAGER_TTL', '300'))
+_secret_cache = {'value': None, 'expires': 0.0}
+
+
+def get_expected_password(secret_arn):
+    """Fetch the expected password, reusing the cached value until it expires."""
+    now = time.monotonic()
+    if _secret_cache['value'] is not None and now < _secret_cache['expires']:
+        return _secret_cache['value']
+
+    secret_response = secrets_client.get_secret_value(SecretId=secret_arn)
+    secret_data = json.loads(secret_response['SecretString'])
+    _secret_cache['value'] = secret_data['password']
+    _secret_cache['expires'] = now + _SECRET_TTL_SECONDS
+    return _secret_cache['value']
+
 
 def lambda_handler(event, context):
     """Lambda authorizer for API Gateway basic authentication."""
     
-    # Debug logging - log the entire event structure
-    print(f"Authorizer event: {json.dumps(event, default=str)}")
-    
+    # Debug logging - log the entire event structure (off by default)
+    if _DEBUG:
+        if orjson is not None:
+            print("Authorizer event:", orjson.dumps(event, default=str).decode())
+        else:
+            print("Authorizer event:", json.dumps(event, default=str))
+
     try:
-        # Extract the authorization token from the event
-        # For TokenAuthorizer, it's in event['authorizationToken']
+        # Extract the authorization token from the event.
+        # TokenAuthorizer events put it in event['authorizationToken'];
+        # HTTP API (v2) request authorizers pass the header through instead.
         auth_token = event.get('authorizationToken')
-        
+        if not auth_token:
+            headers = event.get('headers') or {}
+            auth_token = headers.get('authorization') or headers.get('Authorization')
+
         if not auth_token or not auth_token.startswith('Basic '):
             return generate_policy('user', 'Deny', event['methodArn'])
         
@@ -24,12 +64,9 @@ def lambda_handler(event, context):
         if not secret_arn:
             return generate_policy('user', 'Deny', event['methodArn'])
         
-        # Get the secret value from AWS Secrets Manager
-        secrets_client = boto3.client('secretsmanager')
+        # Get the secret value (cached across warm invocations)
         try:
-            secret_response = secrets_client.get_secret_value(SecretId=secret_arn)
-            secret_data = json.loads(secret_response['SecretString'])
-            expected_password = secret_data['password']
+            expected_password = get_expected_password(secret_arn)
         except (ClientError, KeyError, json.JSONDecodeError):
             return generate_policy('user', 'Deny', event['methodArn'])
         
@@ -38,9 +75,10 @@ def lambda_handler(event, context):
             encoded_credentials = auth_token[6:]  # Remove 'Basic '
             decoded_credentials = base64.b64decode(encoded_credentials).decode('utf-8')
             username, password = decoded_credentials.split(':', 1)
-            
-            # Validate credentials
-            if username == 'admin' and password == expected_password:
+
+            # Validate credentials (constant-time compare; no timing side channel)
+            if (hmac.compare_digest(username.encode(), b'admin')
+                    and hmac.compare_digest(password.encode(), expected_password.encode())):
                 return generate_policy('admin', 'Allow', event['methodArn'])
             else:
                 return generate_policy('user', 'Deny', event['methodArn'])
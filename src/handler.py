@@ -0,0 +1,17 @@
+"""
+Shared Lambda entry point for the MCP server.
+Dispatches API Gateway authorizer and integration events to the right
+handler so both run in a single function and share one warm pool.
+"""
+
+import authorizer
+import lambda_handler
+
+
+def handler(event, context):
+    """Route the event to the authorizer or the MCP request handler."""
+    # Authorizer events carry type=TOKEN/REQUEST and a methodArn;
+    # plain API requests have neither
+    if event.get('type') in ('TOKEN', 'REQUEST') or 'methodArn' in event:
+        return authorizer.lambda_handler(event, context)
+    return lambda_handler.lambda_handler(event, context)
@@ -2,25 +2,114 @@ import json
 import asyncio
 from typing import Any, Dict, List
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 import mcp_markov_models
 
+# Reuse one event loop across warm invocations; containers are long-lived,
+# so per-call loop setup/teardown is pure overhead
+_loop = asyncio.new_event_loop()
+asyncio.set_event_loop(_loop)
+
+# Static protocol payloads, built once per container instead of per request
+_INITIALIZE_RESULT = {
+    "protocolVersion": "2024-11-05",
+    "capabilities": {
+        "tools": {},
+        "logging": {},
+        "prompts": {},
+        "resources": {}
+    },
+    "serverInfo": {
+        "name": "IGG MCP Server",
+        "version": "1.0.0"
+    }
+}
+
+_TOOLS = [
+    {
+        "name": "list_models",
+        "description": "List available Markov models for text generation",
+        "inputSchema": {
+            "type": "object",
+            "properties": {},
+            "required": []
+        }
+    },
+    {
+        "name": "generate_ideas",
+        "description": "Generate creative text ideas using a Markov model",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "model_name": {
+                    "type": "string",
+                    "description": "Name of the model to use for generation"
+                },
+                "count": {
+                    "type": "integer",
+                    "description": "Number of ideas to generate",
+                    "default": 5,
+                    "minimum": 1,
+                    "maximum": 50
+                }
+            },
+            "required": ["model_name"]
+        }
+    },
+    {
+        "name": "generate_with_template",
+        "description": "Generate ideas using a template with placeholders ($1, $2, etc.)",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "model_name": {
+                    "type": "string",
+                    "description": "Name of the model to use for generation"
+                },
+                "template": {
+                    "type": "string",
+                    "description": "Template string with placeholders like 'A $1 for $2 people'"
+                },
+                "count": {
+                    "type": "integer",
+                    "description": "Number of ideas to generate",
+                    "default": 5,
+                    "minimum": 1,
+                    "maximum": 50
+                }
+            },
+            "required": ["model_name", "template"]
+        }
+    }
+]
+_TOOLS_LIST_RESULT = {"tools": _TOOLS}
+
+
+# Built once; create_response only copies when a caller overrides headers
+_DEFAULT_HEADERS = {
+    'Content-Type': 'application/json',
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Headers': 'Content-Type,Authorization',
+    'Access-Control-Allow-Methods': 'GET,POST,OPTIONS'
+}
+
+
+def _dumps(body: dict) -> str:
+    if orjson is not None:
+        return orjson.dumps(body).decode()
+    return json.dumps(body)
+
 
 def create_response(status_code: int, body: dict, headers: dict = None):
     """Create a standardized API Gateway response."""
-    default_headers = {
-        'Content-Type': 'application/json',
-        'Access-Control-Allow-Origin': '*',
-        'Access-Control-Allow-Headers': 'Content-Type,Authorization',
-        'Access-Control-Allow-Methods': 'GET,POST,OPTIONS'
-    }
-    
-    if headers:
-        default_headers.update(headers)
-    
     return {
         'statusCode': status_code,
-        'headers': default_headers,
-        'body': json.dumps(body)
+        'headers': {**_DEFAULT_HEADERS, **headers} if headers else _DEFAULT_HEADERS,
+        'body': _dumps(body)
     }
 
 
@@ -35,19 +124,7 @@ async def handle_mcp_request(body: dict):
             return {
                 "jsonrpc": "2.0",
                 "id": body.get('id'),
-                "result": {
-                    "protocolVersion": "2024-11-05",
-                    "capabilities": {
-                        "tools": {},
-                        "logging": {},
-                        "prompts": {},
-                        "resources": {}
-                    },
-                    "serverInfo": {
-                        "name": "IGG MCP Server",
-                        "version": "1.0.0"
-                    }
-                }
+                "result": _INITIALIZE_RESULT
             }
         
         elif method == 'notifications/initialized':
@@ -72,69 +149,11 @@ async def handle_mcp_request(body: dict):
             }
         
         elif method == 'tools/list':
-            # List available tools
-            tools = [
-                {
-                    "name": "list_models",
-                    "description": "List available Markov models for text generation",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {},
-                        "required": []
-                    }
-                },
-                {
-                    "name": "generate_ideas",
-                    "description": "Generate creative text ideas using a Markov model",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "model_name": {
-                                "type": "string",
-                                "description": "Name of the model to use for generation"
-                            },
-                            "count": {
-                                "type": "integer",
-                                "description": "Number of ideas to generate",
-                                "default": 5,
-                                "minimum": 1,
-                                "maximum": 50
-                            }
-                        },
-                        "required": ["model_name"]
-                    }
-                },
-                {
-                    "name": "generate_with_template",
-                    "description": "Generate ideas using a template with placeholders ($1, $2, etc.)",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "model_name": {
-                                "type": "string",
-                                "description": "Name of the model to use for generation"
-                            },
-                            "template": {
-                                "type": "string",
-                                "description": "Template string with placeholders like 'A $1 for $2 people'"
-                            },
-                            "count": {
-                                "type": "integer",
-                                "description": "Number of ideas to generate",
-                                "default": 5,
-                                "minimum": 1,
-                                "maximum": 50
-                            }
-                        },
-                        "required": ["model_name", "template"]
-                    }
-                }
-            ]
-            
+            # List available tools (static, prebuilt at module load)
             return {
                 "jsonrpc": "2.0",
                 "id": body.get('id'),
-                "result": {"tools": tools}
+                "result": _TOOLS_LIST_RESULT
             }
         
         elif method == 'tools/call':
@@ -205,13 +224,20 @@ async def handle_mcp_request(body: dict):
 
 def lambda_handler(event, context):
     """Main Lambda handler for API Gateway events."""
-    
+
+    # HTTP API payload format 2.0 puts the method at requestContext.http.method
+    # with no top-level httpMethod; keep the v1 field as a fallback for REST
+    # API events and direct invokes
+    method = event.get('httpMethod') or (
+        event.get('requestContext', {}).get('http', {}).get('method')
+    )
+
     # Handle preflight CORS requests
-    if event.get('httpMethod') == 'OPTIONS':
+    if method == 'OPTIONS':
         return create_response(200, {})
-    
+
     # Handle GET request - return basic info (auth handled by API Gateway)
-    if event.get('httpMethod') == 'GET':
+    if method == 'GET':
         return create_response(200, {
             "service": "IGG MCP Server",
             "description": "Markov chain text generation tools for creative idea generation",
@@ -224,17 +250,12 @@ def lambda_handler(event, context):
     except json.JSONDecodeError:
         return create_response(400, {"error": "Invalid JSON in request body"})
     
-    # Handle MCP requests asynchronously
+    # Handle MCP requests asynchronously on the shared loop
     try:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            result = loop.run_until_complete(handle_mcp_request(body))
-            if result is None:
-                # This was a notification with no response
-                return create_response(200, {})
-            return create_response(200, result)
-        finally:
-            loop.close()
+        result = _loop.run_until_complete(handle_mcp_request(body))
+        if result is None:
+            # This was a notification with no response
+            return create_response(200, {})
+        return create_response(200, result)
     except Exception as e:
         return create_response(500, {"error": f"Internal server error: {str(e)}"})
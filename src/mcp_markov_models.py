@@ -3,22 +3,48 @@ MCP Markov Models Module
 Handles model downloading, caching, and text generation for IGG MCP server.
 """
 
+import asyncio
+import gzip
+import http.client
 import json
 import os
 import random
 import re
+import threading
+import time
+from bisect import bisect_right
+from itertools import accumulate
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any
 import urllib.request
 import urllib.parse
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Module-level bindings skip the module-attribute fetch on every draw;
+# generate_phrase additionally rebinds these to locals in its hot loop
+_random = random.random
+_randint = random.randint
+
+# Compiled once at import: skips the re-cache dict probe on every call,
+# which matters on paths hit per request. \Z instead of $ so a trailing
+# newline can't sneak past the name check.
+_NON_ALNUM_RE = re.compile(r'[^a-zA-Z0-9\s]')
+_WS_RE = re.compile(r'\s+')
+_VALID_NAME_RE = re.compile(r'^[a-zA-Z0-9._/-]+\Z')
+_PLACEHOLDER_RE = re.compile(r'\$(\d+)')
+
+
 # Simple text preprocessing without external dependencies
 def preprocess_text(text):
     """Simple text preprocessing without NLTK dependencies."""
     # Remove non-alphanumeric characters (keep letters and numbers)
-    text = re.sub(r'[^a-zA-Z0-9\s]', '', text)
+    text = _NON_ALNUM_RE.sub('', text)
     # Replace multiple spaces with a single space
-    text = re.sub(r'\s+', ' ', text)
+    text = _WS_RE.sub(' ', text)
     # Strip leading and trailing whitespace
     text = text.strip()
     return text
@@ -53,7 +79,7 @@ def validate_model_name(model_name: str) -> None:
         raise ValueError("Model name cannot contain protocol schemes")
     
     # Allow only safe characters: alphanumeric, hyphens, underscores, forward slashes, and dots
-    if not re.match(r'^[a-zA-Z0-9._/-]+$', model_name):
+    if not _VALID_NAME_RE.match(model_name):
         raise ValueError("Model name contains invalid characters")
     
     # Ensure it has a reasonable length limit
@@ -61,36 +87,110 @@ def validate_model_name(model_name: str) -> None:
         raise ValueError("Model name is too long")
 
 
+# One keep-alive connection per origin, reused across warm invocations so
+# repeat fetches skip the TCP+TLS handshake (index.json and the model live
+# on the same host). stdlib http.client stands in for urllib3 here — the
+# Lambda image ships no third-party packages.
+_CONNECTIONS: Dict[str, http.client.HTTPConnection] = {}
+_CONNECTIONS_LOCK = threading.Lock()
+
+
+def _http_get(url: str) -> bytes:
+    """GET a URL over a pooled keep-alive connection, with gzip."""
+    parts = urllib.parse.urlsplit(url)
+    origin = f"{parts.scheme}://{parts.netloc}"
+    path = parts.path or '/'
+    if parts.query:
+        path = f"{path}?{parts.query}"
+
+    with _CONNECTIONS_LOCK:
+        conn = _CONNECTIONS.pop(origin, None)
+
+    # Retry once on a fresh connection if a pooled one has gone stale
+    for attempt in (0, 1):
+        if conn is None:
+            conn_class = (http.client.HTTPSConnection
+                          if parts.scheme == 'https' else http.client.HTTPConnection)
+            conn = conn_class(parts.netloc, timeout=10)
+        try:
+            conn.request('GET', path, headers={'Accept-Encoding': 'gzip'})
+            response = conn.getresponse()
+            body = response.read()
+            break
+        except (http.client.HTTPException, OSError):
+            conn.close()
+            conn = None
+            if attempt:
+                raise
+
+    if response.status >= 400:
+        conn.close()
+        raise Exception(f"HTTP {response.status} for {url}")
+
+    with _CONNECTIONS_LOCK:
+        _CONNECTIONS[origin] = conn
+
+    if response.getheader('Content-Encoding') == 'gzip':
+        body = gzip.decompress(body)
+    return body
+
+
 async def fetch_url(url: str) -> Dict[str, Any]:
-    """Fetch JSON data from URL."""
+    """Fetch JSON data from URL without blocking the event loop."""
+    def _read() -> bytes:
+        return _http_get(url)
+
     try:
-        with urllib.request.urlopen(url) as response:
-            data = response.read().decode('utf-8')
-            return json.loads(data)
+        # urllib blocks, so run it on a worker thread; concurrent fetches
+        # then overlap instead of serializing in the handler's event loop
+        data = await asyncio.to_thread(_read)
+        # Parse the raw bytes directly — no intermediate decode copy, and
+        # orjson's C parser when it's on the image
+        if orjson is not None:
+            return orjson.loads(data)
+        return json.loads(data)
     except Exception as e:
         raise Exception(f"Failed to fetch {url}: {str(e)}")
 
 
+# Cache the resolved index across warm invocations; list_models and
+# load_model both need it, and without the TTL every generation request
+# paid an extra round trip just to resolve name -> path
+_INDEX_TTL_SECONDS = 300
+_index_cache = {'paths_by_name': None, 'expires': 0.0}
+
+
+async def _get_index() -> Dict[str, str]:
+    """Return the model-name -> path map, fetching index.json at most per TTL."""
+    now = time.monotonic()
+    if _index_cache['paths_by_name'] is not None and now < _index_cache['expires']:
+        return _index_cache['paths_by_name']
+
+    index_url = f"{get_base_url()}/index.json"
+    index_data = await fetch_url(index_url)
+
+    # Invert once: name lookups below are O(1) instead of a linear scan
+    paths_by_name = {}
+    for model_path in index_data.get("models", []):
+        model_name = model_path.split('/')[-1]  # Get filename
+        if model_name.endswith('.json'):
+            model_name = model_name[:-5]  # Remove .json
+        paths_by_name[model_name] = model_path
+
+    _index_cache['paths_by_name'] = paths_by_name
+    _index_cache['expires'] = now + _INDEX_TTL_SECONDS
+    return paths_by_name
+
+
 async def list_models() -> Dict[str, Any]:
     """List available models from the web endpoint."""
     base_url = get_base_url()
-    index_url = f"{base_url}/index.json"
-    
+
     try:
-        index_data = await fetch_url(index_url)
-        models = index_data.get("models", [])
-        
-        # Extract model names from paths (remove .json extension and path)
-        model_names = []
-        for model_path in models:
-            model_name = model_path.split('/')[-1]  # Get filename
-            if model_name.endswith('.json'):
-                model_name = model_name[:-5]  # Remove .json
-            model_names.append(model_name)
-        
+        paths_by_name = await _get_index()
         return {
             "base_url": base_url,
-            "models": model_names
+            "models": list(paths_by_name)
         }
     except Exception as e:
         # Fallback to known models
@@ -100,80 +200,172 @@ async def list_models() -> Dict[str, Any]:
         }
 
 
+# Prepared models, memoized per name for the life of the container; models
+# are immutable once published, so steady-state requests skip the fetch,
+# the JSON parse and the sampler prep entirely. Per-name locks stop
+# concurrent misses from dogpiling the same download.
+_MODEL_CACHE_MAX = 16
+_MODEL_CACHE: Dict[str, List[Dict[str, Any]]] = {}
+_MODEL_LOCKS: Dict[str, asyncio.Lock] = {}
+
+
 async def load_model(model_name: str) -> List[Dict[str, Any]]:
-    """Load a model from web (no caching for Lambda)."""
+    """Load a model from web, memoized in-process (no disk cache on Lambda)."""
     validate_model_name(model_name)
-    
-    # Get the actual model paths from index
+
+    cached = _MODEL_CACHE.pop(model_name, None)
+    if cached is not None:
+        _MODEL_CACHE[model_name] = cached  # re-insert: dict order tracks recency
+        return cached
+
+    lock = _MODEL_LOCKS.setdefault(model_name, asyncio.Lock())
+    async with lock:
+        # Another coroutine may have populated the cache while we waited
+        cached = _MODEL_CACHE.get(model_name)
+        if cached is not None:
+            return cached
+
+        markov_models = await _fetch_model(model_name)
+
+        while len(_MODEL_CACHE) >= _MODEL_CACHE_MAX:
+            _MODEL_CACHE.pop(next(iter(_MODEL_CACHE)))  # evict least recent
+        _MODEL_CACHE[model_name] = markov_models
+        return markov_models
+
+
+async def _fetch_model(model_name: str) -> List[Dict[str, Any]]:
+    """Fetch and prepare a model's sub-models from the web endpoint."""
     base_url = get_base_url()
-    index_url = f"{base_url}/index.json"
-    
+
     try:
-        index_data = await fetch_url(index_url)
-        models = index_data.get("models", [])
-        
-        # Find the model path that matches our model name
-        model_path = None
-        for path in models:
-            filename = path.split('/')[-1]  # Get filename
-            if filename == f"{model_name}.json":
-                model_path = path
-                break
-        
+        # Resolve the model path via the TTL-cached index
+        paths_by_name = await _get_index()
+        model_path = paths_by_name.get(model_name)
+
         if not model_path:
             raise Exception(f"Model '{model_name}' not found in index")
-        
-        # Load the model
+
+        # Load the model and build sampler tables once, while it's hot
         model_url = f"{base_url}/{model_path}"
-        return await fetch_url(model_url)
-        
+        markov_models = await fetch_url(model_url)
+        return [_prepare_model(model) for model in markov_models]
+
     except Exception as e:
         raise Exception(f"Failed to load model '{model_name}': {str(e)}")
 
 
+class _AliasSampler:
+    """O(1) weighted sampler over a probability dict (Vose alias method).
+
+    Built once per distribution at model-load time; each sample is two
+    uniform draws and two list indexes, regardless of distribution size.
+    Pure stdlib — the MCP Lambda deliberately ships no dependencies.
+    """
+
+    __slots__ = ('items', 'prob', 'alias', 'n')
+
+    def __init__(self, prob_dict: Dict[str, float]):
+        items = tuple(prob_dict)
+        n = len(items)
+        total = sum(prob_dict.values())
+        scaled = [w * n / total for w in prob_dict.values()]
+
+        prob = [0.0] * n
+        alias = [0] * n
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+
+        while small and large:
+            s = small.pop()
+            l = large[-1]
+            prob[s] = scaled[s]
+            alias[s] = l
+            scaled[l] -= 1.0 - scaled[s]
+            if scaled[l] < 1.0:
+                large.pop()
+                small.append(l)
+        # Whatever is left sits at exactly 1.0 modulo float error
+        for i in large:
+            prob[i] = 1.0
+        for i in small:
+            prob[i] = 1.0
+
+        # Tuples, not lists: immutable, slightly faster to index, and safe
+        # to share across threads without defensive copies
+        self.items = items
+        self.prob = tuple(prob)
+        self.alias = tuple(alias)
+        self.n = n
+
+    def sample(self) -> str:
+        # One uniform covers both decisions: the integer part picks the
+        # bucket, the fractional part plays against the bucket's threshold.
+        # Halves PRNG state updates per token versus two draws.
+        u = _random() * self.n
+        i = int(u)
+        if u - i < self.prob[i]:
+            return self.items[i]
+        return self.items[self.alias[i]]
+
+
+def _prepare_model(model: Dict[str, Any]) -> Dict[str, Any]:
+    """Attach prepared sampler structures to a freshly parsed model dict.
+
+    The model is immutable after load, so per-distribution alias tables are
+    built once here instead of rebuilding cumulative weights on every draw
+    in generate_phrase.
+    """
+    if '_start_sampler' in model:
+        return model
+    model['_start_sampler'] = _AliasSampler(model['start_words'])
+    model['_end_sampler'] = _AliasSampler(model['end_words'])
+    model['_transition_samplers'] = {
+        word: _AliasSampler(dist)
+        for word, dist in model['transitions'].items()
+        if dist
+    }
+    # Immutable per-model facts generate_phrase would otherwise recompute
+    # on every call: full vocabulary (tuple indexes without copying),
+    # end-word membership set, and the longest observed phrase length
+    model['_vocabulary'] = tuple(
+        model['transitions'].keys()
+        | model['end_words'].keys()
+        | model['start_words'].keys()
+    )
+    model['_end_word_set'] = frozenset(model['end_words'])
+    model['_max_length'] = max(int(k) for k in model['lengths'])
+    # Each word's outbound distribution restricted to end words: once a
+    # walk is past its target length, sampling from this terminates in one
+    # step instead of drawing until an end word happens to come up
+    end_set = model['_end_word_set']
+    model['_end_transition_samplers'] = {
+        word: _AliasSampler(restricted)
+        for word, dist in model['transitions'].items()
+        if (restricted := {w: p for w, p in dist.items() if w in end_set})
+    }
+    return model
+
+
 def weighted_random_choice(items: List[str], weights: List[float]) -> str:
     """Select item based on weighted probabilities."""
     if not items or not weights:
         raise ValueError("Items and weights cannot be empty")
-    
-    cumulative_weights = []
-    for i, weight in enumerate(weights):
-        cumulative_weights.append(weight + (cumulative_weights[i-1] if i > 0 else 0))
-    
-    random_val = random.random() * cumulative_weights[-1]
-    for i, cum_weight in enumerate(cumulative_weights):
-        if random_val <= cum_weight:
-            return items[i]
-    
-    return items[-1]  # Fallback
+
+    # One C-level prefix-sum pass plus a binary search, instead of two
+    # Python loops over the weights per draw
+    cumulative_weights = list(accumulate(weights))
+    random_val = _random() * cumulative_weights[-1]
+    return items[min(bisect_right(cumulative_weights, random_val), len(items) - 1)]
 
 
 def sample_phrase_length(max_length: int) -> int:
     """Sample target phrase length between 2 and max_length."""
-    return random.randint(2, max_length)
+    return _randint(2, max_length)
 
 
-def select_start_word(start_words_prob: Dict[str, float]) -> str:
+def select_start_word(model: Dict[str, Any]) -> str:
     """Select starting word based on probabilities."""
-    start_words = list(start_words_prob.keys())
-    start_weights = list(start_words_prob.values())
-    return weighted_random_choice(start_words, start_weights)
-
-
-def select_next_word(current_word: str, transitions: Dict[str, Dict[str, float]], 
-                    vocabulary: set) -> Optional[str]:
-    """Select next word based on current word or randomly (5% chance)."""
-    random_chance = random.random()
-    if random_chance < 0.05:  # 5% chance for random word
-        return select_random_word(vocabulary)
-    else:
-        next_words_prob = transitions.get(current_word)
-        if not next_words_prob:
-            return None
-        
-        next_words = list(next_words_prob.keys())
-        next_weights = list(next_words_prob.values())
-        return weighted_random_choice(next_words, next_weights)
+    return model['_start_sampler'].sample()
 
 
 def is_end_word(word: str, end_words: Dict[str, float]) -> bool:
@@ -181,61 +373,92 @@ def is_end_word(word: str, end_words: Dict[str, float]) -> bool:
     return word in end_words
 
 
-def select_random_end_word(end_words_prob: Dict[str, float]) -> str:
+def select_random_end_word(model: Dict[str, Any]) -> str:
     """Select random end word based on probabilities."""
-    end_words = list(end_words_prob.keys())
-    end_weights = list(end_words_prob.values())
-    return weighted_random_choice(end_words, end_weights)
+    return model['_end_sampler'].sample()
 
 
-def select_random_word(vocabulary: set) -> str:
-    """Select random word from vocabulary."""
-    words = list(vocabulary)
-    return random.choice(words)
+def select_random_word(vocabulary: tuple) -> str:
+    """Select random word from the prepared vocabulary tuple."""
+    # Direct indexing — no O(|V|) list copy, no random.choice indirection
+    return vocabulary[int(_random() * len(vocabulary))]
 
 
 def generate_phrase(model: Dict[str, Any]) -> str:
     """Generate a single phrase using a Markov model."""
+    _prepare_model(model)  # no-op once prepared structures are attached
     transitions = model["transitions"]
-    start_words = model["start_words"]
-    end_words = model["end_words"]
-    lengths = model["lengths"]
-    
-    # Determine max observed length
-    max_length = max(int(k) for k in lengths.keys())
+    transition_samplers = model["_transition_samplers"]
+    end_words = model["_end_word_set"]
+
+    # Cached at load time; the model is immutable after parsing
+    max_length = model["_max_length"]
+    vocabulary = model["_vocabulary"]
+    vocab_len = len(vocabulary)
     target_length = sample_phrase_length(max_length)
-    
-    current_word = select_start_word(start_words)
-    phrase = [current_word]
-    
-    # Build vocabulary set
-    vocabulary = set()
-    vocabulary.update(transitions.keys())
-    vocabulary.update(end_words.keys())
-    vocabulary.update(start_words.keys())
-    
+
     max_attempts = 1000
-    attempts = 0
-    
-    while attempts < max_attempts:
-        attempts += 1
-        
-        next_word = select_next_word(current_word, transitions, vocabulary)
-        if not next_word:
-            break  # No transitions from current word
-        
-        phrase.append(next_word)
-        current_word = next_word
-        
-        # Check if we've reached target length
-        if len(phrase) >= target_length:
-            if is_end_word(current_word, end_words):
-                break  # Good ending point
-        
-        # Prevent infinite loops
-        if len(phrase) >= max_length:
-            return generate_phrase(model)  # Recurse for new attempt
-    
+    max_restarts = 8  # replaces the old implicit recursion-depth bound
+
+    # The walk below is the hot loop: the sampling is inlined rather than
+    # routed through select_next_word/_AliasSampler.sample so each token
+    # costs straight-line bytecode instead of several Python frames
+    rand = _random
+    get_sampler = transition_samplers.get
+    get_end_sampler = model["_end_transition_samplers"].get
+
+    for _restart in range(max_restarts):
+        # Restart resets only the walk state; the prepared model
+        # structures above are reused instead of recursing from scratch
+        current_word = select_start_word(model)
+        phrase = [current_word]
+        append = phrase.append
+        attempts = 0
+        overran = False
+
+        while attempts < max_attempts:
+            attempts += 1
+
+            # Past the target length, steer straight into an end word when
+            # the current word transitions to one
+            if len(phrase) >= target_length:
+                end_sampler = get_end_sampler(current_word)
+                if end_sampler is not None:
+                    current_word = end_sampler.sample()
+                    append(current_word)
+                    break
+
+            if rand() < 0.05:  # 5% chance for random word
+                next_word = vocabulary[int(rand() * vocab_len)]
+            else:
+                sampler = get_sampler(current_word)
+                if sampler is None:
+                    break  # No transitions from current word
+                # Single draw: integer part picks the bucket, fractional
+                # part decides bucket vs alias
+                u = rand() * sampler.n
+                i = int(u)
+                if u - i < sampler.prob[i]:
+                    next_word = sampler.items[i]
+                else:
+                    next_word = sampler.items[sampler.alias[i]]
+
+            append(next_word)
+            current_word = next_word
+
+            # Check if we've reached target length
+            if len(phrase) >= target_length:
+                if is_end_word(current_word, end_words):
+                    break  # Good ending point
+
+            # Walk ran past the longest observed phrase; start over
+            if len(phrase) >= max_length:
+                overran = True
+                break
+
+        if not overran:
+            break
+
     # Ensure last word is an end word
     if not is_end_word(current_word, end_words):
         # Try to find end word from current transitions
@@ -249,30 +472,35 @@ def generate_phrase(model: Dict[str, Any]) -> str:
             phrase.append(current_word)
         else:
             # Append random end word
-            random_end_word = select_random_end_word(end_words)
+            random_end_word = select_random_end_word(model)
             phrase.append(random_end_word)
     
     return " ".join(phrase)
 
 
+def generate_phrases(model: Dict[str, Any], count: int) -> List[str]:
+    """Generate a batch of phrases from one sub-model in a single pass.
+
+    Batching per model amortizes the prepared-structure lookups across the
+    whole batch instead of re-entering per (row, model) pair.
+    """
+    _prepare_model(model)
+    return [generate_phrase(model) for _ in range(count)]
+
+
 async def generate_ideas(model_name: str, count: int = 5) -> List[str]:
     """Generate ideas using a specific model."""
     try:
         markov_models = await load_model(model_name)
-        ideas = []
-        
-        for _ in range(count):
-            # Generate phrase from each column/model
-            row_phrases = []
-            for model in markov_models:
-                phrase = generate_phrase(model)
-                row_phrases.append(phrase)
-            
-            # Join phrases with space
-            idea = " ".join(row_phrases)
-            ideas.append(idea)
-        
-        return ideas
+
+        # Column-major: one batch per sub-model, then zip batches into rows.
+        # The batches are pure-Python CPU work, so they run on worker
+        # threads — the event loop stays free to serve other requests
+        phrases_per_model = await asyncio.gather(*[
+            asyncio.to_thread(generate_phrases, model, count)
+            for model in markov_models
+        ])
+        return [" ".join(row) for row in zip(*phrases_per_model)]
     except Exception as e:
         raise Exception(f"Failed to generate ideas: {str(e)}")
 
@@ -284,29 +512,30 @@ async def generate_with_template(model_name: str, template: str, count: int = 5)
         ideas = []
         
         # Find placeholders in template ($1, $2, etc.)
-        placeholders = re.findall(r'\$(\d+)', template)
+        placeholders = _PLACEHOLDER_RE.findall(template)
         if not placeholders:
             raise ValueError("Template must contain placeholders like $1, $2, etc.")
         
-        max_placeholder = max(int(p) for p in placeholders)
+        used_indices = {int(p) for p in placeholders}
+        max_placeholder = max(used_indices)
         if max_placeholder > len(markov_models):
             raise ValueError(f"Template requires {max_placeholder} models but only {len(markov_models)} available")
-        
-        for _ in range(count):
-            # Generate phrases for each model
-            generated_phrases = []
-            for model in markov_models:
-                phrase = generate_phrase(model)
-                generated_phrases.append(phrase)
-            
-            # Fill template with generated phrases
-            filled_template = template
-            for i, phrase in enumerate(generated_phrases, 1):
-                placeholder = f"${i}"
-                filled_template = filled_template.replace(placeholder, phrase)
-            
-            ideas.append(filled_template)
-        
+
+        # Generate batches only for the sub-models the template references
+        # (a "$1 $3" template never pays for $2), off-loop as above
+        indices = sorted(used_indices)
+        batch_lists = await asyncio.gather(*[
+            asyncio.to_thread(generate_phrases, markov_models[i - 1], count)
+            for i in indices
+        ])
+        batches = dict(zip(indices, batch_lists))
+
+        # Single regex pass per row instead of one full rescan per placeholder
+        for row in range(count):
+            ideas.append(_PLACEHOLDER_RE.sub(
+                lambda match: batches[int(match.group(1))][row], template
+            ))
+
         return ideas
     except Exception as e:
         raise Exception(f"Failed to generate templated ideas: {str(e)}")
@@ -1,80 +1,167 @@
+import gzip
 import json
 import os
 import csv
-import boto3
 import re
-from io import StringIO
+import sys
+import boto3
+from botocore.config import Config
+from botocore.exceptions import ClientError
+from io import BytesIO, StringIO
 from typing import Dict, List, Any
 import logging
 from collections import defaultdict, Counter
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import chain
 
+import numpy as np
 import pandas as pd
 import nltk
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-s3_client = boto3.client('s3')
+# The download/upload thread pools and the transfer manager's ranged GETs
+# all share this client, so give it more connections than the default 10
+s3_client = boto3.client('s3', config=Config(max_pool_connections=32))
 
 # Initialize NLTK (Lambda-friendly paths)
 nltk.data.path.append("/tmp")
 nltk.download('punkt', download_dir='/tmp', quiet=True)
 nltk.download('punkt_tab', download_dir='/tmp', quiet=True)
 
+# Force the multi-megabyte Punkt model load at cold start rather than on
+# the first record's tokenize call; tolerate absence so import survives
+# environments without the data
+try:
+    nltk.word_tokenize('warm up')
+except LookupError:
+    pass
+
+
+# Below this size the dict comprehension beats the NumPy round-trip
+_NUMPY_NORMALIZE_MIN_KEYS = 64
+
 
 # Markov chain generation functions (from existing generate_markov_models.py)
 def normalize(counter):
     """Function to normalize counts to probabilities."""
+    if len(counter) >= _NUMPY_NORMALIZE_MIN_KEYS:
+        # SIMD division over one flat array, then zip back to native floats
+        keys = list(counter)
+        vals = np.fromiter(counter.values(), dtype=np.float64, count=len(counter))
+        vals /= vals.sum()
+        return dict(zip(keys, vals.tolist()))
     total = sum(counter.values())
     return {k: v / total for k, v in counter.items()}
 
 
+# Uploaded corpora repeat cells heavily (greetings, boilerplate), so
+# memoizing turns the repeat regex work into a dict hit
+PREPROCESS_CACHE_SIZE = int(os.environ.get('PREPROCESS_CACHE_SIZE', '4096'))
+
+
+class _DropNonAlnumTable(dict):
+    """str.translate table deleting everything but [a-zA-Z0-9] and whitespace.
+
+    Codepoints are classified lazily on first sight and remembered, so the
+    table stays small instead of enumerating all of Unicode up front.
+    """
+
+    def __missing__(self, codepoint):
+        ch = chr(codepoint)
+        keep = ('a' <= ch <= 'z' or 'A' <= ch <= 'Z'
+                or '0' <= ch <= '9' or ch.isspace())
+        result = ch if keep else None
+        self[codepoint] = result
+        return result
+
+
+_TRANSLATE_TABLE = _DropNonAlnumTable()
+_TRANSLATE_TABLE.update((cp, _TRANSLATE_TABLE[cp]) for cp in range(128))
+
+
+@lru_cache(maxsize=PREPROCESS_CACHE_SIZE)
 def preprocess_text(text):
     """Function to preprocess text."""
-    # Remove non-alphanumeric characters (keep letters and numbers)
-    text = re.sub(r'[^a-zA-Z0-9\s]', '', text)
-    # Replace multiple spaces with a single space
-    text = re.sub(r'\s+', ' ', text)
-    # Strip leading and trailing whitespace
-    text = text.strip()
-    return text
+    # One C-level table pass drops non-alphanumerics; split/join collapses
+    # whitespace runs and strips the ends — no regex engine in the path
+    return ' '.join(text.translate(_TRANSLATE_TABLE).split())
+
+
+# Punkt tokenization is the hot path and corpora repeat phrases heavily;
+# a tuple result is immutable so it's safe to hand out cached
+@lru_cache(maxsize=8192)
+def _tokenize(phrase):
+    """Tokenize a preprocessed phrase, memoized across repeats.
+
+    Tokens are interned so repeated words share one string object: the
+    counter lookups downstream short-circuit on identity, and the
+    accumulated state stores each distinct token once.
+    """
+    return tuple(map(sys.intern, nltk.word_tokenize(phrase)))
 
 
 def extract_phrases(end_words, lengths, phrases, start_words, transitions):
     """Extract phrases and build transition data."""
-    for phrase in phrases:
-        # Preprocess the phrase
-        clean_phrase = preprocess_text(phrase)
+    token_lists = [_tokenize(preprocess_text(phrase)) for phrase in phrases]
 
-        # Tokenize the phrase into words
-        tokens = nltk.word_tokenize(clean_phrase)
-        lengths.append(len(tokens))
+    lengths.extend(map(len, token_lists))
 
-        if tokens:
-            # Count the start word
-            start_words[tokens[0]] += 1
-            # Count the end word
-            end_words[tokens[-1]] += 1
+    # Count start and end words in bulk (C-level Counter.update)
+    start_words.update(tokens[0] for tokens in token_lists if tokens)
+    end_words.update(tokens[-1] for tokens in token_lists if tokens)
 
-            # Build transitions
-            for i in range(len(tokens) - 1):
-                transitions[tokens[i]][tokens[i + 1]] += 1
+    # Count all bigrams in one C-level pass, then pivot into the nested
+    # transition mapping — mirrors the offline generator's accumulator
+    bigram_counts = Counter()
+    bigram_counts.update(
+        chain.from_iterable(zip(tokens, tokens[1:]) for tokens in token_lists)
+    )
+    for (prev, nxt), count in bigram_counts.items():
+        transitions[prev][nxt] += count
 
 
-def extract_columns(df):
-    """Extract Markov models from DataFrame columns."""
-    markov_models = []
+# Compiled once; pandas otherwise re-resolves the pattern on every chunk
+_NON_ALNUM_RE = re.compile(r'[^a-zA-Z0-9\s]')
+
+
+def update_columns(state, df):
+    """Accumulate per-column transition counts from one DataFrame chunk."""
+    if state is None:
+        state = {}
 
-    # Process each column
     for col in df.columns:
-        phrases = df[col].dropna().astype(str).tolist()
-        transitions = defaultdict(Counter)
-        start_words = Counter()
-        end_words = Counter()
-        lengths = []
+        # Bulk-clean the column inside pandas' C layer; extract_phrases'
+        # own preprocess_text call then reduces to a cache hit per phrase
+        phrases = (
+            df[col].dropna().astype(str)
+            .str.replace(_NON_ALNUM_RE, '', regex=True)
+            .str.split().str.join(' ')
+            .tolist()
+        )
+        col_state = state.get(col)
+        if col_state is None:
+            # (transitions, start_words, end_words, lengths)
+            col_state = state[col] = (defaultdict(Counter), Counter(), Counter(), [])
+        transitions, start_words, end_words, lengths = col_state
 
         extract_phrases(end_words, lengths, phrases, start_words, transitions)
 
+    return state
+
+
+def finalize_columns(state):
+    """Normalize accumulated counts into the per-column model dicts."""
+    markov_models = []
+
+    for col, (transitions, start_words, end_words, lengths) in state.items():
         # Normalize the counts
         transitions_prob = {k: normalize(v) for k, v in transitions.items()}
         start_words_prob = normalize(start_words)
@@ -95,6 +182,42 @@ def extract_columns(df):
     return markov_models
 
 
+def extract_columns(df):
+    """Extract Markov models from DataFrame columns."""
+    return finalize_columns(update_columns(None, df))
+
+
+def update_columns_from_rows(state, rows):
+    """Accumulate per-column counts from plain csv.reader rows.
+
+    DataFrame-free twin of update_columns for the small-object fast path;
+    cell cleanup happens in extract_phrases' memoized preprocess_text.
+    """
+    if state is None:
+        state = {}
+    if not rows:
+        return state
+
+    # One pass over the rows transposes them into per-column phrase lists,
+    # instead of rescanning the whole row list once per column
+    width = max(len(row) for row in rows)
+    phrases_by_col = [[] for _ in range(width)]
+    for row in rows:
+        for col, cell in enumerate(row):
+            if cell not in (None, ''):
+                phrases_by_col[col].append(cell)
+
+    for col, phrases in enumerate(phrases_by_col):
+        col_state = state.get(col)
+        if col_state is None:
+            col_state = state[col] = (defaultdict(Counter), Counter(), Counter(), [])
+        transitions, start_words, end_words, lengths = col_state
+
+        extract_phrases(end_words, lengths, phrases, start_words, transitions)
+
+    return state
+
+
 def lambda_handler(event, context):
     """
     Lambda handler for processing CSV files uploaded to S3.
@@ -102,50 +225,105 @@ def lambda_handler(event, context):
     """
     bucket_name = os.environ['BUCKET_NAME']
     index_file = os.environ.get('INDEX_FILE', 'index.json')
-    
+
     try:
-        for record in event['Records']:
+        csv_keys = []
+        csv_sizes = []
+        for record in unwrap_records(event):
             # Get the uploaded file details
             s3_event = record['s3']
             key = s3_event['object']['key']
-            
+
             logger.info(f"Processing file: {key}")
-            
+
             # Skip if not a CSV file
             if not key.lower().endswith('.csv'):
                 logger.info(f"Skipping non-CSV file: {key}")
                 continue
-            
-            # Download and process the CSV file
-            csv_content = download_file(bucket_name, key)
-            json_data = process_csv(csv_content, key)
-            
-            # Generate output JSON file path (same path, .json extension)
-            json_key = key.rsplit('.', 1)[0] + '.json'
-            
-            # Upload the JSON file
-            upload_json(bucket_name, json_key, json_data)
-            
-            # Update the index
-            update_index(bucket_name, index_file, json_key, json_data)
-            
-            logger.info(f"Successfully processed {key} -> {json_key}")
-        
+
+            csv_keys.append(key)
+            # The notification carries the object size; it picks the
+            # download strategy without an extra HEAD round trip
+            csv_sizes.append(s3_event['object'].get('size'))
+
+        if csv_keys:
+            # Overlap the S3 round trips; downloads are I/O-bound and
+            # independent, so a small thread pool hides most of the latency
+            with ThreadPoolExecutor(max_workers=min(8, len(csv_keys))) as pool:
+                contents = list(pool.map(
+                    lambda args: download_file(bucket_name, *args),
+                    zip(csv_keys, csv_sizes)
+                ))
+
+            # CPU-bound conversion stays serial
+            json_items = []
+            for key, csv_content in zip(csv_keys, contents):
+                json_data = process_csv(csv_content, key)
+                # Generate output JSON file path (same path, .json extension)
+                json_key = key.rsplit('.', 1)[0] + '.json'
+                json_items.append((key, json_key, json_data))
+
+            # Uploads overlap like the downloads did
+            with ThreadPoolExecutor(max_workers=min(8, len(json_items))) as pool:
+                list(pool.map(
+                    lambda item: upload_json(bucket_name, item[1], item[2]),
+                    json_items
+                ))
+
+            # One read-modify-write for the whole batch instead of one
+            # index round trip per file
+            update_index(bucket_name, index_file,
+                         [(json_key, json_data) for _, json_key, json_data in json_items])
+            for key, json_key, _ in json_items:
+                logger.info(f"Successfully processed {key} -> {json_key}")
+
         return {
             'statusCode': 200,
             'body': json.dumps({
                 'message': f'Successfully processed {len(event["Records"])} files'
             })
         }
-        
+
     except Exception as e:
         logger.error(f"Error processing files: {str(e)}")
         raise
 
 
-def download_file(bucket_name: str, key: str) -> str:
-    """Download file content from S3."""
+def unwrap_records(event) -> List[Dict[str, Any]]:
+    """
+    Yield S3 notification records from a Lambda event.
+
+    Supports both direct S3 notifications and S3 notifications batched
+    through SQS, where each SQS message body wraps an S3 event.
+    """
+    records = []
+    for record in event['Records']:
+        if 'body' in record:
+            # SQS-wrapped S3 notification (one S3 event per message body)
+            body = json.loads(record['body'])
+            records.extend(body.get('Records', []))
+        else:
+            records.append(record)
+    return records
+
+
+# Above this size the transfer manager's parallel ranged GETs beat a
+# single-connection get_object; below it the extra round trips cost more
+S3_MULTIPART_BYTES = int(os.environ.get('S3_MULTIPART_BYTES', str(8 * 1024 * 1024)))
+
+
+def download_file(bucket_name: str, key: str, size: int = None) -> str:
+    """Download file content from S3.
+
+    When the S3 event reports an object size past the multipart threshold,
+    download_fileobj fans the read out across ranged GETs; otherwise a
+    single get_object avoids the transfer manager's extra HEAD request.
+    """
     try:
+        if size is not None and size >= S3_MULTIPART_BYTES:
+            buffer = BytesIO()
+            s3_client.download_fileobj(bucket_name, key, buffer)
+            return buffer.getvalue().decode('utf-8')
         response = s3_client.get_object(Bucket=bucket_name, Key=key)
         return response['Body'].read().decode('utf-8')
     except Exception as e:
@@ -153,21 +331,41 @@ def download_file(bucket_name: str, key: str) -> str:
         raise
 
 
+# Rows parsed per chunk; bounds peak memory on large uploads so the
+# working set stays well inside the Lambda allocation
+CSV_CHUNK_SIZE = int(os.environ.get('CSV_CHUNK_SIZE', '50000'))
+
+# Below this payload size the C-implemented stdlib csv reader beats
+# DataFrame construction outright
+CSV_SMALL_OBJECT_BYTES = int(os.environ.get('CSV_SMALL_OBJECT_BYTES', str(256 * 1024)))
+
+
 def process_csv(csv_content: str, filename: str) -> Dict[str, Any]:
     """Process CSV content and convert to Markov chain models."""
     try:
-        # Read CSV into pandas DataFrame (matching original generate_markov_models.py)
-        df = pd.read_csv(StringIO(csv_content), header=None)
-        
-        # Generate Markov models using existing logic
-        markov_models = extract_columns(df)
-        
+        state = None
+        row_count = 0
+        if len(csv_content) < CSV_SMALL_OBJECT_BYTES:
+            # Small object: plain csv.reader rows, no DataFrame at all
+            rows = [row for row in csv.reader(StringIO(csv_content)) if row]
+            row_count = len(rows)
+            state = update_columns_from_rows(state, rows)
+        else:
+            # Stream the CSV in chunks, folding each into the per-column
+            # counts as it parses, instead of materializing the whole frame
+            for chunk in pd.read_csv(StringIO(csv_content), header=None,
+                                     chunksize=CSV_CHUNK_SIZE):
+                row_count += len(chunk)
+                state = update_columns(state, chunk)
+
+        markov_models = finalize_columns(state or {})
+
         # Create JSON structure with metadata and Markov chains
         json_data = {
             'metadata': {
                 'source_file': filename,
-                'column_count': len(df.columns),
-                'row_count': len(df),
+                'column_count': len(state or {}),
+                'row_count': row_count,
                 'model_type': 'markov_chain',
                 'generated_at': context.aws_request_id if 'context' in globals() else 'unknown'
             },
@@ -181,61 +379,125 @@ def process_csv(csv_content: str, filename: str) -> Dict[str, Any]:
         raise
 
 
+def _dump_json(data: Dict[str, Any]) -> bytes:
+    """Serialize for S3: orjson's C encoder when the layer provides it.
+
+    Compact output either way — these objects are fetched by machines, and
+    indentation roughly doubles dense probability dicts.
+    """
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(',', ':')).encode('utf-8')
+
+
 def upload_json(bucket_name: str, key: str, data: Dict[str, Any]) -> None:
-    """Upload JSON data to S3."""
+    """Upload JSON data to S3, gzip-compressed.
+
+    Probability dicts are full of repeated token strings, so even level-1
+    gzip shrinks the PUT severalfold for a trivial CPU cost; ContentEncoding
+    lets consumers decompress transparently on GET.
+    """
     try:
         s3_client.put_object(
             Bucket=bucket_name,
             Key=key,
-            Body=json.dumps(data, indent=2),
-            ContentType='application/json'
+            Body=gzip.compress(_dump_json(data), compresslevel=1),
+            ContentType='application/json',
+            ContentEncoding='gzip'
         )
     except Exception as e:
         logger.error(f"Error uploading {key}: {str(e)}")
         raise
 
 
-def update_index(bucket_name: str, index_key: str, new_file_key: str, file_data: Dict[str, Any]) -> None:
-    """Update the index.json file with information about the new JSON file."""
+# Bounded optimistic-concurrency retries for the index read-modify-write
+_INDEX_UPDATE_ATTEMPTS = 3
+
+
+def update_index(bucket_name: str, index_key: str, new_files: List[Any]) -> None:
+    """Update index.json with a batch of (file_key, file_data) entries.
+
+    The whole batch lands in one conditional PutObject; IfMatch on the
+    fetched ETag detects concurrent writers, and a lost race refetches and
+    retries a bounded number of times.
+    """
     try:
-        # Try to get existing index
-        try:
-            response = s3_client.get_object(Bucket=bucket_name, Key=index_key)
-            index_data = json.loads(response['Body'].read().decode('utf-8'))
-        except s3_client.exceptions.NoSuchKey:
-            # Create new index if it doesn't exist
-            index_data = {
-                'files': [],
-                'last_updated': None,
-                'total_files': 0
+        for _attempt in range(_INDEX_UPDATE_ATTEMPTS):
+            # Try to get existing index
+            etag = None
+            try:
+                response = s3_client.get_object(Bucket=bucket_name, Key=index_key)
+                index_data = json.loads(response['Body'].read().decode('utf-8'))
+                etag = response.get('ETag')
+            except s3_client.exceptions.NoSuchKey:
+                # Create new index if it doesn't exist
+                index_data = {
+                    'files': [],
+                    'last_updated': None,
+                    'total_files': 0
+                }
+
+            # Index entries keyed by path: O(1) duplicate detection instead
+            # of an O(n) list scan per upload
+            files_by_path = {f.get('path'): f for f in index_data.get('files', [])}
+            last_modified = context.aws_request_id if 'context' in globals() else 'unknown'
+
+            changed = False
+            for new_file_key, file_data in new_files:
+                file_entry = {
+                    'path': new_file_key,
+                    'model_type': file_data['metadata'].get('model_type', 'markov_chain'),
+                    'column_count': file_data['metadata'].get('column_count', 0),
+                    'row_count': file_data['metadata'].get('row_count', 0),
+                    'model_count': len(file_data.get('markov_models', [])),
+                    'last_modified': last_modified
+                }
+
+                # Entries already up to date add nothing to the write
+                # (last_modified aside, nothing would change)
+                existing_entry = files_by_path.get(new_file_key)
+                if existing_entry is not None and all(
+                    existing_entry.get(k) == file_entry[k]
+                    for k in ('model_type', 'column_count', 'row_count', 'model_count')
+                ):
+                    continue
+
+                files_by_path[new_file_key] = file_entry
+                changed = True
+
+            # Skip the re-upload entirely when no entry changed
+            if not changed:
+                return
+
+            index_data['files'] = list(files_by_path.values())
+
+            # Update metadata
+            index_data['total_files'] = len(index_data['files'])
+            index_data['last_updated'] = last_modified
+
+            # Upload updated index; IfMatch fails with 412 if another
+            # invocation wrote the index since our read
+            put_kwargs = {
+                'Bucket': bucket_name,
+                'Key': index_key,
+                'Body': _dump_json(index_data),
+                'ContentType': 'application/json'
             }
-        
-        # Update or add file entry
-        file_entry = {
-            'path': new_file_key,
-            'model_type': file_data['metadata'].get('model_type', 'markov_chain'),
-            'column_count': file_data['metadata'].get('column_count', 0),
-            'row_count': file_data['metadata'].get('row_count', 0),
-            'model_count': len(file_data.get('markov_models', [])),
-            'last_modified': context.aws_request_id if 'context' in globals() else 'unknown'
-        }
-        
-        # Remove existing entry if it exists, then add new one
-        index_data['files'] = [f for f in index_data.get('files', []) if f.get('path') != new_file_key]
-        index_data['files'].append(file_entry)
-        
-        # Update metadata
-        index_data['total_files'] = len(index_data['files'])
-        index_data['last_updated'] = file_entry['last_modified']
-        
-        # Upload updated index
-        s3_client.put_object(
-            Bucket=bucket_name,
-            Key=index_key,
-            Body=json.dumps(index_data, indent=2),
-            ContentType='application/json'
-        )
-        
+            if etag:
+                put_kwargs['IfMatch'] = etag
+
+            try:
+                s3_client.put_object(**put_kwargs)
+                return
+            except ClientError as e:
+                if e.response.get('Error', {}).get('Code') not in (
+                        'PreconditionFailed', '412'):
+                    raise
+                logger.info(f"Index {index_key} changed concurrently; retrying")
+
+        logger.error(f"Gave up updating index {index_key} after "
+                     f"{_INDEX_UPDATE_ATTEMPTS} attempts")
+
     except Exception as e:
         logger.error(f"Error updating index {index_key}: {str(e)}")
         # Don't raise - index update failure shouldn't fail the whole process
@@ -47,13 +47,20 @@ def test_extract_phrases_creates_transitions():
     assert transitions["Hello"]["world"] == 1
     assert transitions["Hello"]["there"] == 1
 
-@patch('generate_markov_models.nltk.download')
-@patch('generate_markov_models.pd.read_csv')
+@patch('generate_markov_models.read_csv')
 @patch('generate_markov_models.json.dump')
 @patch('generate_markov_models.open', new_callable=MagicMock)
-def test_generate_creates_json(mock_open, mock_json_dump, mock_read_csv, mock_nltk_download, sample_dataframe):
+def test_generate_creates_json(mock_open, mock_json_dump, mock_read_csv, sample_dataframe):
     mock_read_csv.return_value = sample_dataframe
     generate_markov_models.generate('input.csv', 'output.json')
-    mock_read_csv.assert_called_once_with('input.csv', header=None)
+    mock_read_csv.assert_called_once_with('input.csv')
     mock_json_dump.assert_called_once()
     mock_open.assert_called_once_with('output.json', 'w')
+
+def test_read_csv_falls_back_to_pandas(sample_dataframe):
+    with patch('generate_markov_models.pa_csv', None), \
+         patch('generate_markov_models.pd.read_csv') as mock_read_csv:
+        mock_read_csv.return_value = sample_dataframe
+        result = generate_markov_models.read_csv('input.csv')
+        mock_read_csv.assert_called_once_with('input.csv', header=None)
+        assert result is sample_dataframe
@@ -2,6 +2,7 @@ import pytest
 from unittest.mock import patch, MagicMock, mock_open
 import pandas as pd
 from collections import Counter, defaultdict
+import gzip
 import json
 from io import StringIO
 
@@ -11,6 +12,13 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 import model_processor
 
 
+@pytest.fixture(autouse=True)
+def clear_preprocess_cache():
+    """Keep memoized preprocessing from leaking state across tests."""
+    model_processor.preprocess_text.cache_clear()
+    model_processor._tokenize.cache_clear()
+
+
 @pytest.fixture
 def sample_csv_content():
     """Sample CSV content for testing."""
@@ -61,6 +69,15 @@ class TestMarkovFunctions:
         expected = {'a': 0.2, 'b': 0.3, 'c': 0.5}
         assert result == expected
 
+    def test_normalize_large_vocabulary(self):
+        # Exercises the vectorized path above the size threshold
+        counter = Counter({f'word{i}': i + 1 for i in range(200)})
+        result = model_processor.normalize(counter)
+        assert len(result) == 200
+        assert abs(sum(result.values()) - 1.0) < 1e-9
+        total = sum(counter.values())
+        assert result['word0'] == pytest.approx(1 / total)
+
     def test_normalize_handles_empty_counter(self):
         counter = Counter()
         result = model_processor.normalize(counter)
@@ -81,12 +98,12 @@ class TestMarkovFunctions:
         result = model_processor.preprocess_text(text)
         assert result == "Hello world"
 
-    @patch('model_processor.nltk.word_tokenize')
+    @patch('model_processor._tokenize')
     def test_extract_phrases_creates_transitions(self, mock_tokenize):
         mock_tokenize.side_effect = [
-            ["Hello", "world"],
-            ["Hello", "there"],
-            ["world", "peace"]
+            ("Hello", "world"),
+            ("Hello", "there"),
+            ("world", "peace")
         ]
         
         phrases = ["Hello world", "Hello there", "world peace"]
@@ -131,29 +148,30 @@ class TestMarkovFunctions:
 class TestCSVProcessing:
     """Test CSV processing functionality."""
 
-    @patch('model_processor.extract_columns')
+    @pytest.mark.parametrize('small', [True, False])
+    @patch('model_processor.extract_phrases')
     @patch('model_processor.pd.read_csv')
-    def test_process_csv_creates_markov_models(self, mock_read_csv, mock_extract_columns, sample_csv_content):
-        # Mock pandas read_csv
-        mock_df = MagicMock()
-        mock_df.columns = [0, 1]
-        mock_df.__len__ = MagicMock(return_value=3)
-        mock_read_csv.return_value = mock_df
-        
-        # Mock extract_columns
-        mock_markov_models = [
-            {
-                'column_index': 0,
-                'transitions': {'Hello': {'world': 1.0}},
-                'start_words': {'Hello': 1.0},
-                'end_words': {'world': 1.0},
-                'lengths': {2: 1.0}
-            }
-        ]
-        mock_extract_columns.return_value = mock_markov_models
-        
+    def test_process_csv_creates_markov_models(self, mock_read_csv, mock_extract_phrases,
+                                               small, sample_csv_content, sample_dataframe,
+                                               monkeypatch):
+        if not small:
+            # Force the chunked pandas path regardless of payload size
+            monkeypatch.setattr(model_processor, 'CSV_SMALL_OBJECT_BYTES', 0)
+
+        # Chunked reading yields an iterator of DataFrames
+        mock_read_csv.return_value = iter([sample_dataframe])
+
+        # Mock extract_phrases to avoid NLTK dependency in tests
+        def mock_extract_side_effect(end_words, lengths, phrases, start_words, transitions):
+            start_words.update({'Hello': 1})
+            end_words.update({'world': 1})
+            transitions['Hello']['world'] = 1
+            lengths.extend([2])
+
+        mock_extract_phrases.side_effect = mock_extract_side_effect
+
         result = model_processor.process_csv(sample_csv_content, "test.csv")
-        
+
         # Verify structure
         assert 'metadata' in result
         assert 'markov_models' in result
@@ -161,12 +179,18 @@ class TestCSVProcessing:
         assert result['metadata']['column_count'] == 2
         assert result['metadata']['row_count'] == 3
         assert result['metadata']['model_type'] == 'markov_chain'
-        assert result['markov_models'] == mock_markov_models
-        
-        # Verify pandas was called correctly
-        mock_read_csv.assert_called_once()
-        args, kwargs = mock_read_csv.call_args
-        assert kwargs.get('header') is None
+        assert len(result['markov_models']) == 2
+        assert result['markov_models'][0]['transitions'] == {'Hello': {'world': 1.0}}
+
+        if small:
+            # Small payloads take the stdlib csv fast path
+            mock_read_csv.assert_not_called()
+        else:
+            # Verify pandas was called correctly
+            mock_read_csv.assert_called_once()
+            args, kwargs = mock_read_csv.call_args
+            assert kwargs.get('header') is None
+            assert kwargs.get('chunksize') == model_processor.CSV_CHUNK_SIZE
 
 
 class TestS3Operations:
@@ -179,9 +203,25 @@ class TestS3Operations:
         }
         
         result = model_processor.download_file('test-bucket', 'test.csv')
-        
+
         assert result == 'test,content'
         mock_s3_client.get_object.assert_called_once_with(Bucket='test-bucket', Key='test.csv')
+        mock_s3_client.download_fileobj.assert_not_called()
+
+    @patch('model_processor.s3_client')
+    def test_download_file_large_uses_transfer_manager(self, mock_s3_client):
+        def fake_download(bucket, key, fileobj):
+            fileobj.write(b'big,content')
+
+        mock_s3_client.download_fileobj.side_effect = fake_download
+
+        result = model_processor.download_file(
+            'test-bucket', 'big.csv', size=model_processor.S3_MULTIPART_BYTES
+        )
+
+        assert result == 'big,content'
+        mock_s3_client.download_fileobj.assert_called_once()
+        mock_s3_client.get_object.assert_not_called()
 
     @patch('model_processor.s3_client')
     def test_download_file_handles_exception(self, mock_s3_client):
@@ -201,8 +241,9 @@ class TestS3Operations:
         assert kwargs['Bucket'] == 'test-bucket'
         assert kwargs['Key'] == 'test.json'
         assert kwargs['ContentType'] == 'application/json'
-        # Verify JSON content
-        uploaded_data = json.loads(kwargs['Body'])
+        assert kwargs['ContentEncoding'] == 'gzip'
+        # Verify JSON content survives the compression round trip
+        uploaded_data = json.loads(gzip.decompress(kwargs['Body']))
         assert uploaded_data == test_data
 
 
@@ -224,17 +265,19 @@ class TestIndexManagement:
             'markov_models': [{'test': 'model'}, {'test': 'model2'}]
         }
         
-        model_processor.update_index('test-bucket', 'index.json', 'test.json', test_file_data)
-        
+        model_processor.update_index('test-bucket', 'index.json', [('test.json', test_file_data)])
+
         # Verify put_object was called to create new index
         mock_s3_client.put_object.assert_called_once()
         args, kwargs = mock_s3_client.put_object.call_args
         uploaded_index = json.loads(kwargs['Body'])
-        
+
         assert uploaded_index['total_files'] == 1
         assert len(uploaded_index['files']) == 1
         assert uploaded_index['files'][0]['path'] == 'test.json'
         assert uploaded_index['files'][0]['model_count'] == 2
+        # No ETag on a fresh index, so the put is unconditional
+        assert 'IfMatch' not in kwargs
 
     @patch('model_processor.s3_client')
     def test_update_index_updates_existing_index(self, mock_s3_client):
@@ -246,9 +289,10 @@ class TestIndexManagement:
         }
         
         mock_s3_client.get_object.return_value = {
-            'Body': MagicMock(read=MagicMock(return_value=json.dumps(existing_index).encode()))
+            'Body': MagicMock(read=MagicMock(return_value=json.dumps(existing_index).encode())),
+            'ETag': '"etag-1"'
         }
-        
+
         test_file_data = {
             'metadata': {
                 'model_type': 'markov_chain',
@@ -257,16 +301,67 @@ class TestIndexManagement:
             },
             'markov_models': [{'test': 'model'}]
         }
-        
-        model_processor.update_index('test-bucket', 'index.json', 'new.json', test_file_data)
-        
-        # Verify index was updated
+
+        model_processor.update_index('test-bucket', 'index.json', [('new.json', test_file_data)])
+
+        # Verify index was updated with one conditional put
         mock_s3_client.put_object.assert_called_once()
         args, kwargs = mock_s3_client.put_object.call_args
         uploaded_index = json.loads(kwargs['Body'])
-        
+
         assert uploaded_index['total_files'] == 2
         assert len(uploaded_index['files']) == 2
+        assert kwargs['IfMatch'] == '"etag-1"'
+
+    @patch('model_processor.s3_client')
+    def test_update_index_batches_multiple_entries(self, mock_s3_client):
+        mock_s3_client.exceptions.NoSuchKey = Exception
+        mock_s3_client.get_object.side_effect = Exception("NoSuchKey")
+
+        entries = [
+            (f'file-{i}.json', {
+                'metadata': {'model_type': 'markov_chain', 'column_count': 1, 'row_count': i},
+                'markov_models': [{'test': 'model'}]
+            })
+            for i in range(3)
+        ]
+
+        model_processor.update_index('test-bucket', 'index.json', entries)
+
+        # The whole batch lands in a single put
+        mock_s3_client.put_object.assert_called_once()
+        args, kwargs = mock_s3_client.put_object.call_args
+        uploaded_index = json.loads(kwargs['Body'])
+        assert uploaded_index['total_files'] == 3
+
+    @patch('model_processor.s3_client')
+    def test_update_index_retries_on_precondition_failure(self, mock_s3_client):
+        from botocore.exceptions import ClientError
+
+        mock_s3_client.get_object.return_value = {
+            'Body': MagicMock(side_effect=None,
+                              read=MagicMock(side_effect=[
+                                  json.dumps({'files': [], 'total_files': 0,
+                                              'last_updated': None}).encode()
+                                  for _ in range(2)
+                              ])),
+            'ETag': '"etag-1"'
+        }
+        precondition_error = ClientError(
+            {'Error': {'Code': 'PreconditionFailed'}}, 'PutObject'
+        )
+        mock_s3_client.put_object.side_effect = [precondition_error, None]
+
+        test_file_data = {
+            'metadata': {'model_type': 'markov_chain', 'column_count': 1, 'row_count': 1},
+            'markov_models': [{'test': 'model'}]
+        }
+
+        model_processor.update_index('test-bucket', 'index.json', [('new.json', test_file_data)])
+
+        # Lost the race once, refetched, then succeeded
+        assert mock_s3_client.put_object.call_count == 2
+        assert mock_s3_client.get_object.call_count == 2
 
 
 class TestLambdaHandler:
@@ -300,10 +395,46 @@ class TestLambdaHandler:
         assert '1 files' in result['body']
         
         # Verify function calls
-        mock_download.assert_called_once_with('test-bucket', 'test-file.csv')
+        mock_download.assert_called_once_with('test-bucket', 'test-file.csv', None)
         mock_process.assert_called_once_with("test,csv,content", 'test-file.csv')
         mock_upload.assert_called_once_with('test-bucket', 'test-file.json', mock_markov_data)
-        mock_update_index.assert_called_once_with('test-bucket', 'index.json', 'test-file.json', mock_markov_data)
+        mock_update_index.assert_called_once_with(
+            'test-bucket', 'index.json', [('test-file.json', mock_markov_data)]
+        )
+
+    @patch('model_processor.update_index')
+    @patch('model_processor.upload_json')
+    @patch('model_processor.process_csv')
+    @patch('model_processor.download_file')
+    @patch.dict('os.environ', {
+        'BUCKET_NAME': 'test-bucket',
+        'INDEX_FILE': 'index.json'
+    })
+    def test_lambda_handler_processes_multiple_records(
+        self, mock_download, mock_process, mock_upload, mock_update_index, sample_context
+    ):
+        event = {
+            'Records': [
+                {'s3': {'bucket': {'name': 'test-bucket'},
+                        'object': {'key': f'file-{i}.csv'}}}
+                for i in range(3)
+            ]
+        }
+        mock_download.return_value = "test,csv,content"
+        mock_process.return_value = {
+            'metadata': {'model_type': 'markov_chain'},
+            'markov_models': [{'test': 'model'}]
+        }
+
+        result = model_processor.lambda_handler(event, sample_context)
+
+        assert result['statusCode'] == 200
+        assert mock_download.call_count == 3
+        assert mock_upload.call_count == 3
+        # The whole batch goes through one index update
+        mock_update_index.assert_called_once()
+        entries = mock_update_index.call_args[0][2]
+        assert len(entries) == 3
 
     @patch('model_processor.download_file')
     @patch.dict('os.environ', {